@@ -0,0 +1,41 @@
+"""Analytics snapshot job - exports complaints into the columnar report store"""
+import argparse
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models.campus import campus_context
+from services.analytics import export_snapshot, snapshot_directory
+
+def run_snapshots(once=False):
+    """Rebuild each campus's analytics snapshot now, and then on an interval"""
+    app = create_app(web=False)
+
+    while True:
+        for campus in app.config['CAMPUSES']:
+            with campus_context(app, campus):
+                directory = snapshot_directory(app.config, campus)
+                os.makedirs(directory, exist_ok=True)
+
+                started = time.perf_counter()
+                rows = export_snapshot(directory)
+                elapsed = time.perf_counter() - started
+                print(f"✅ {campus}: snapshot written, {rows} complaints in {elapsed:.2f}s")
+
+        if once:
+            break
+        time.sleep(app.config['ANALYTICS_SNAPSHOT_INTERVAL'])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--once', action='store_true', help='write one snapshot and exit')
+    args = parser.parse_args()
+
+    try:
+        run_snapshots(once=args.once)
+    except KeyboardInterrupt:
+        print("👋 Snapshot job stopped")
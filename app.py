@@ -2,29 +2,47 @@
 from flask import Flask, render_template
 from config import Config
 from models import db, login_manager, init_app as init_models
+from services.assets import init_assets
+from services.admission import init_admission
 import os
 
-def create_app(config_class=Config):
-    """Application factory"""
+def create_app(config_class=Config, web=True):
+    """Application factory
+    
+    Scripts that only need the database (init_db.py and the workers) pass
+    web=False to skip the blueprints, static assets and admission control.
+    """
     app = Flask(__name__)
     app.config.from_object(config_class)
     
     # Initialize extensions
     init_models(app)
+    if not web:
+        return app
     
     # Create upload folder
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    # Serve fingerprinted, precompressed CSS/JS when build_assets.py has been run
+    init_assets(app)
+    
+    # Throttle login and complaint submission bursts
+    init_admission(app)
+    
     # Register blueprints
     from routes.auth import auth_bp
     from routes.student import student_bp
     from routes.department import department_bp
     from routes.admin import admin_bp
+    from routes.intake import intake_bp
+    from routes.feed import feed_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(student_bp)
     app.register_blueprint(department_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(intake_bp)
+    app.register_blueprint(feed_bp)
     
     # Error handlers
     @app.errorhandler(404)
@@ -0,0 +1,53 @@
+"""ASGI entry point - async handlers for the I/O-bound endpoints, Flask for everything else
+
+    uvicorn --factory asgi:create_asgi_app --workers 4
+
+The feed API, its event stream and attachment upload/download are served by
+coroutines (routes/async_api.py) on async database engines. All other
+requests go to the usual Flask app, run on a pool of ASGI_WSGI_THREADS
+threads, so template-heavy and CPU-bound pages behave exactly as under WSGI.
+"""
+import os
+import sys
+from contextlib import asynccontextmanager
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from app import create_app
+from config import Config
+from routes.async_api import async_routes
+from services.async_db import AsyncDatabase
+
+def create_asgi_app(config_class=Config):
+    """Application factory for the ASGI serving mode"""
+    flask_app = create_app(config_class)
+    database = AsyncDatabase(flask_app)
+    
+    @asynccontextmanager
+    async def lifespan(asgi_app):
+        yield
+        await database.dispose()
+    
+    routes = async_routes(flask_app) + [
+        Mount('/', app=WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WSGI_THREADS']))
+    ]
+    asgi_app = Starlette(routes=routes, lifespan=lifespan)
+    asgi_app.state.flask_app = flask_app
+    asgi_app.state.database = database
+    return asgi_app
+
+if __name__ == '__main__':
+    import uvicorn
+    
+    print("=" * 60)
+    print("🎓 Student Complaint Portal (ASGI)")
+    print("=" * 60)
+    print("🌐 Server running at: http://localhost:5000")
+    print("=" * 60)
+    print()
+    
+    uvicorn.run('asgi:create_asgi_app', factory=True, host='0.0.0.0', port=5000)
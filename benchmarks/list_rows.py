@@ -0,0 +1,134 @@
+"""List-view benchmark - full ORM hydration vs ComplaintRow projections.
+
+Seeds a throwaway SQLite database with complaints, then loads them the way a
+dashboard does (ticket, subject, status and priority badges, dates, student
+name and room, department name) through both paths and reports per-row CPU
+time and peak memory.
+
+    python benchmarks/list_rows.py --rows 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from models import db
+from models.complaint import Complaint
+from models.department import Department
+from models.projections import ComplaintRow
+from models.user import User
+
+STATUSES = ['Pending', 'In Progress', 'Completed']
+PRIORITIES = ['Low', 'Medium', 'High', 'Urgent']
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = f'sqlite:///{tempfile.mkdtemp()}/bench.db'
+    ADMISSION_LIMITS = {}
+
+def seed(rows):
+    """Insert departments, students and ``rows`` complaints"""
+    departments = [Department(name=f'Dept {i}', email=f'dept{i}@klu.ac.in') for i in range(5)]
+    db.session.add_all(departments)
+    db.session.flush()
+
+    students = [
+        User(name=f'Student {i}', email=f's{i}@klu.ac.in', password_hash='x', role='student',
+             registration_number=f'R{i}', room_number=f'{"ABCD"[i % 4]}-{100 + i % 50}')
+        for i in range(200)
+    ]
+    db.session.add_all(students)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    db.session.bulk_insert_mappings(Complaint, [
+        {
+            'ticket_id': f'TCK-BENCH-{i:06d}',
+            'student_id': students[i % len(students)].id,
+            'department_id': departments[i % len(departments)].id,
+            'subject': f'Complaint subject number {i}',
+            'description': 'A fairly long description of the problem. ' * 12,
+            'status': STATUSES[i % len(STATUSES)],
+            'priority': PRIORITIES[i % len(PRIORITIES)],
+            'created_at': now - timedelta(minutes=i),
+            'last_update_at': now - timedelta(minutes=i),
+            'last_update_type': 'created',
+            'reply_count': 0,
+            'version': 1
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+def orm_rows():
+    """The previous list-page path: hydrate Complaint with its student and department"""
+    complaints = Complaint.query.options(
+        db.joinedload(Complaint.student), db.joinedload(Complaint.department)
+    ).order_by(Complaint.created_at.desc()).all()
+    return [
+        (c.ticket_id, c.subject, c.status, c.get_status_color(), c.priority, c.get_priority_color(),
+         c.created_at, c.student.name, c.student.room_number, c.department.name)
+        for c in complaints
+    ]
+
+def projection_rows():
+    """Column-only query into __slots__ rows with precomputed badge classes"""
+    rows = list(ComplaintRow.iterate(ComplaintRow.query().order_by(Complaint.created_at.desc())))
+    return [
+        (r.ticket_id, r.subject, r.status, r.status_color, r.priority, r.priority_color,
+         r.created_at, r.student_name, r.room_number, r.department_name)
+        for r in rows
+    ]
+
+def measure(fn, rows, repeat):
+    """Best-of-N wall time and peak traced memory for one load of every row"""
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+        assert len(result) == rows
+        del result
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+def run_benchmark(rows, repeat):
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        print(f"🚀 Seeding {rows} complaints...")
+        seed(rows)
+
+        results = {}
+        for name, fn in [('ORM', orm_rows), ('Projection', projection_rows)]:
+            results[name] = measure(fn, rows, repeat)
+
+    print()
+    print(f"{'Path':<12}{'Total ms':>10}{'µs/row':>10}{'Peak MB':>10}{'bytes/row':>11}")
+    for name, (seconds, peak) in results.items():
+        print(f"{name:<12}{seconds * 1000:>10.1f}{seconds * 1e6 / rows:>10.1f}{peak / 1e6:>10.1f}{peak / rows:>11.0f}")
+
+    (orm_time, orm_peak), (proj_time, proj_peak) = results['ORM'], results['Projection']
+    print()
+    print(f"✅ Projection rows: {orm_time / proj_time:.1f}x faster, {orm_peak / proj_peak:.1f}x less peak memory")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='complaints to seed (default 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs per path; the best is reported')
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.repeat)
@@ -0,0 +1,219 @@
+"""Serving-mode benchmark - threaded WSGI (app.py) vs ASGI (asgi.py).
+
+Starts each server in its own process on a throwaway SQLite database, then
+holds an increasing number of /api/feed/stream connections open (the
+long-lived case) and, at each level, times plain /api/feed/events JSON reads
+and samples the server's resident memory and thread count.
+
+    python benchmarks/serving_modes.py --levels 100,250,500,1000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import Config
+
+OPEN_TIMEOUT = 20  # seconds for a level's streams to start
+READ_SAMPLES = 20
+
+
+def benchmark_config(database):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+        ADMISSION_LIMITS = {}
+        FEED_SETTLE_SECONDS = 0
+        FEED_STREAM_SECONDS = 3600
+        FEED_STREAM_POLL_INTERVAL = 2
+    return BenchmarkConfig
+
+
+def seed(database):
+    """Create one complaint with a few events and a feed consumer; returns (token, last sequence)"""
+    from app import create_app
+    from models import db
+    from models.complaint import Complaint
+    from models.department import Department
+    from models.feed import ComplaintEvent, FeedConsumer
+    from models.user import User
+
+    app = create_app(benchmark_config(database))
+    with app.app_context():
+        db.create_all()
+        department = Department(name='Plumbing', email='plumbing@klu.ac.in')
+        student = User(name='Student', email='s@klu.ac.in', password_hash='x', role='student', registration_number='R1')
+        db.session.add_all([department, student])
+        db.session.flush()
+
+        complaint = Complaint(ticket_id='TCK-BENCH-1', student_id=student.id, department_id=department.id,
+                              subject='Leaking tap', description='Leaking tap')
+        db.session.add(complaint)
+        db.session.flush()
+        events = [ComplaintEvent.record(complaint, 'reply', student.id, n=i) for i in range(10)]
+        db.session.commit()
+
+        _, token = FeedConsumer.register('benchmark', token_prefix=f"{app.config['DEFAULT_CAMPUS']}.")
+        return token, events[-1].id
+
+
+def serve(mode, port, database):
+    """Child process: run one server mode until killed"""
+    import logging
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    config = benchmark_config(database)
+
+    if mode == 'wsgi':
+        from werkzeug.serving import run_simple
+        from app import create_app
+        run_simple('127.0.0.1', port, create_app(config), threaded=True)
+    else:
+        import uvicorn
+        from asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(config), host='127.0.0.1', port=port, log_level='error', backlog=4096)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def process_stats(pid):
+    """(RSS in MB, thread count) from /proc"""
+    stats = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            stats[key] = value.split()
+    return int(stats['VmRSS'][0]) / 1024, int(stats['Threads'][0])
+
+
+def request_bytes(path, token, close=False):
+    headers = [f'GET {path} HTTP/1.1', 'Host: localhost', f'Authorization: Bearer {token}']
+    if close:
+        headers.append('Connection: close')
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode()
+
+
+async def open_stream(port, token, after):
+    """Open a feed stream and wait for its first event; returns the writer to keep it open"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(request_bytes(f'/api/feed/stream?after={after}', token))
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    if int(head.split()[1]) != 200:
+        raise RuntimeError(head.split(b'\r\n', 1)[0].decode())
+    await reader.readuntil(b'\n')
+    return writer
+
+
+async def timed_read(port, token):
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(request_bytes('/api/feed/events?limit=1', token, close=True))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    if b' 200 ' not in response.split(b'\r\n', 1)[0]:
+        raise RuntimeError('feed read failed')
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_levels(port, pid, token, after, levels):
+    """Ramp open streams through each level; returns one row of measurements per level"""
+    writers, rows = [], []
+    for level in levels:
+        attempts = [open_stream(port, token, after) for _ in range(level - len(writers))]
+        results = await asyncio.wait_for(asyncio.gather(*attempts, return_exceptions=True), OPEN_TIMEOUT * 2)
+        writers += [r for r in results if not isinstance(r, BaseException)]
+
+        latencies = []
+        for _ in range(READ_SAMPLES):
+            try:
+                latencies.append(await asyncio.wait_for(timed_read(port, token), OPEN_TIMEOUT))
+            except (asyncio.TimeoutError, OSError, RuntimeError):
+                pass
+        rss, threads = process_stats(pid)
+        rows.append((level, len(writers), latencies, rss, threads))
+
+    for writer in writers:
+        writer.close()
+    return rows
+
+
+def wait_for_port(port, proc, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('server exited during startup')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+
+def run_benchmark(levels):
+    database = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    print("🚀 Seeding benchmark database...")
+    token, last = seed(database)
+
+    results = {}
+    for mode in ['wsgi', 'asgi']:
+        port = free_port()
+        log_path = os.path.join(os.path.dirname(database), f'{mode}.log')
+        with open(log_path, 'w') as log:
+            proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', mode,
+                                     '--port', str(port), '--database', database],
+                                    cwd=ROOT, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_for_port(port, proc)
+            time.sleep(0.5)
+            baseline = process_stats(proc.pid)[0]
+            print(f"⏳ {mode.upper()}: ramping to {levels[-1]} streams...")
+            results[mode] = (baseline, asyncio.run(run_levels(port, proc.pid, token, last - 1, levels)))
+        finally:
+            proc.kill()
+            proc.wait()
+        if os.path.getsize(log_path):
+            print(f"⚠️  {mode.upper()} server logged errors (e.g. pool timeouts): {log_path}")
+
+    print()
+    print(f"{'Mode':<6}{'Target':>8}{'Open':>7}{'Reads':>7}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>9}{'KB/conn':>9}{'Threads':>9}")
+    for mode, (baseline, rows) in results.items():
+        for level, opened, latencies, rss, threads in rows:
+            p50 = statistics.median(latencies) if latencies else float('nan')
+            p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1] if latencies else float('nan')
+            per_connection = (rss - baseline) * 1024 / opened if opened else float('nan')
+            print(f"{mode.upper():<6}{level:>8}{opened:>7}{len(latencies):>7}{p50:>9.1f}{p95:>9.1f}"
+                  f"{rss:>9.1f}{per_connection:>9.1f}{threads:>9}")
+
+    print()
+    for mode, (baseline, rows) in results.items():
+        served = max([level for level, opened, latencies, _, _ in rows
+                      if opened == level and len(latencies) == READ_SAMPLES] or [0])
+        print(f"✅ {mode.upper()}: {served} concurrent streams with every JSON read answered (idle RSS {baseline:.1f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--levels', default='100,250,500,1000', help='open-stream counts to ramp through')
+    parser.add_argument('--serve', choices=['wsgi', 'asgi'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.database)
+    else:
+        run_benchmark(sorted(int(level) for level in args.levels.split(',')))
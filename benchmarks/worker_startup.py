@@ -0,0 +1,162 @@
+"""Worker startup benchmark - cold workers vs the preloaded, warmed wsgi.py entry point.
+
+Reports:
+- import + factory time for the script factory (create_app(web=False)),
+  the web app, and the web app plus warm_app
+- time from launching gunicorn to the first 200 response, and that first
+  request's own latency
+- shared versus private memory per worker (from /proc/<pid>/smaps_rollup)
+  after every worker has served requests
+
+    python benchmarks/worker_startup.py --workers 4
+"""
+import argparse
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FACTORIES = [
+    ('scripts (web=False)', 'from app import create_app; create_app(web=False)'),
+    ('web app', 'from app import create_app; create_app()'),
+    ('web app + warm_app', 'from app import create_app; from services.warmup import warm_app; warm_app(create_app())'),
+]
+
+SERVERS = [
+    ('cold workers', ['app:create_app()']),
+    ('preload + warm', ['--preload', 'wsgi:app']),
+]
+
+PAGES = ['/login', '/register']
+
+
+def time_factory(code, env, runs):
+    """Median wall time of a fresh interpreter running ``code``"""
+    timed = f'import time; _t = time.perf_counter(); {code}; print(time.perf_counter() - _t)'
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', timed], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]) * 1000)
+    return statistics.median(samples)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def fetch(port, path):
+    started = time.perf_counter()
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=30) as response:
+        response.read()
+        return response.status, (time.perf_counter() - started) * 1000
+
+
+def first_response(port, proc, timeout=60):
+    """Poll until the server answers; returns the latency of the first successful request"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            status, latency = fetch(port, PAGES[0])
+            if status == 200:
+                return latency
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError('gunicorn did not answer')
+
+
+def worker_pids(master_pid):
+    """Children of every thread of the master (workers may be forked from any of them)"""
+    pids = []
+    for task in os.listdir(f'/proc/{master_pid}/task'):
+        with open(f'/proc/{master_pid}/task/{task}/children') as f:
+            pids += [int(pid) for pid in f.read().split()]
+    return pids
+
+
+def memory_kb(pid):
+    """(shared, private) resident memory in kB"""
+    stats = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                stats[parts[0][:-1]] = int(parts[1])
+    return (stats['Shared_Clean'] + stats['Shared_Dirty'],
+            stats['Private_Clean'] + stats['Private_Dirty'])
+
+
+def run_server(args, workers, env):
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--workers', str(workers),
+                             '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', *args],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        first_latency = first_response(port, proc)
+        ready = (time.perf_counter() - started) * 1000
+
+        # Wait for the whole pool, then give every worker a chance to serve each page
+        deadline = time.monotonic() + 30
+        while len(worker_pids(proc.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.1)
+        for _ in range(workers * 10):
+            for path in PAGES:
+                fetch(port, path)
+
+        memory = [memory_kb(pid) for pid in worker_pids(proc.pid)]
+        return ready, first_latency, memory
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+def run_benchmark(workers, runs):
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+
+    print(f"🚀 Timing app factories ({runs} runs each)...")
+    factory_times = [(name, time_factory(code, env, runs)) for name, code in FACTORIES]
+
+    print(f"🚀 Starting gunicorn with {workers} workers...")
+    servers = [(name, run_server(args, workers, env)) for name, args in SERVERS]
+
+    print()
+    print(f"{'Import + factory':<24}{'ms':>8}")
+    for name, ms in factory_times:
+        print(f"{name:<24}{ms:>8.0f}")
+
+    print()
+    print(f"{'Server':<18}{'Ready ms':>10}{'1st req ms':>12}{'Shared MB':>11}{'Private MB':>12}{'Total private MB':>18}")
+    for name, (ready, first_latency, memory) in servers:
+        shared = statistics.mean(s for s, _ in memory) / 1024
+        private = statistics.mean(p for _, p in memory) / 1024
+        print(f"{name:<18}{ready:>10.0f}{first_latency:>12.1f}{shared:>11.1f}{private:>12.1f}"
+              f"{sum(p for _, p in memory) / 1024:>18.1f}")
+
+    cold, warm = servers[0][1], servers[1][1]
+    saved = (sum(p for _, p in cold[2]) - sum(p for _, p in warm[2])) / 1024
+    print()
+    print(f"✅ Preloading saves {saved:.1f} MB of private memory across {workers} workers; "
+          f"first request {cold[1]:.1f} ms -> {warm[1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers (default 4)')
+    parser.add_argument('--runs', type=int, default=5, help='interpreter launches per factory timing')
+    args = parser.parse_args()
+    run_benchmark(args.workers, args.runs)
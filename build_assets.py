@@ -0,0 +1,69 @@
+"""Static asset build script - fingerprints and precompresses CSS/JS"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from services.assets import DIST_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+SOURCE_DIRS = ['css', 'js']
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json'}
+
+def fingerprint(path):
+    """Short content hash used in the output filename"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+def build_assets():
+    """Write hashed copies, .gz/.br siblings and the manifest into static/dist"""
+    dist_root = os.path.join(STATIC_DIR, DIST_DIR)
+    if os.path.exists(dist_root):
+        shutil.rmtree(dist_root)
+
+    manifest = {}
+    for source_dir in SOURCE_DIRS:
+        for root, _, files in os.walk(os.path.join(STATIC_DIR, source_dir)):
+            for name in sorted(files):
+                source = os.path.join(root, name)
+                rel = os.path.relpath(source, STATIC_DIR).replace(os.sep, '/')
+                stem, ext = os.path.splitext(rel)
+                hashed = f'{DIST_DIR}/{stem}.{fingerprint(source)}{ext}'
+
+                target = os.path.join(STATIC_DIR, hashed)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(source, target)
+
+                if ext in COMPRESSIBLE:
+                    with open(source, 'rb') as f:
+                        data = f.read()
+                    with open(target + '.gz', 'wb') as f:
+                        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                    if brotli:
+                        with open(target + '.br', 'wb') as f:
+                            f.write(brotli.compress(data, quality=11))
+
+                manifest[rel] = hashed
+                print(f"✅ {rel} -> {hashed}")
+
+    with open(Config.ASSET_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print()
+    print(f"✅ Wrote {len(manifest)} asset(s) to static/{DIST_DIR}")
+    if not brotli:
+        print("ℹ️  Install 'brotli' to also emit .br files")
+
+if __name__ == "__main__":
+    build_assets()
@@ -11,6 +11,95 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'mp4', 'avi', 'mov', 'pdf'}
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # bytes per read for raw attachment uploads
+    
+    # Fingerprinted static assets (built by build_assets.py)
+    ASSET_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'dist', 'manifest.json')
+    ASSET_MAX_AGE = 365 * 24 * 3600
+    
+    # Attachment derivatives (thumbnails, previews, video posters)
+    THUMBNAIL_SIZE = 320
+    PREVIEW_SIZE = 1280
+    MEDIA_WORKERS = 2
+    MEDIA_STALE_MINUTES = 10  # pending this long = job lost (see regenerate_derivatives.py)
+    
+    # Streamed list pages (department/student dashboards, admin user directory)
+    STREAM_CHUNK_SIZE = 16 * 1024  # characters per response chunk
+    STREAM_BATCH_SIZE = 500  # rows fetched per round trip
+    
+    # Admin user directory
+    USER_DIRECTORY_PAGE_SIZE = 50
+    
+    # Batch intake API (/api/intake/complaints)
+    INTAKE_MAX_BATCH = 500
+    
+    # Change-data feed (/api/feed and feed_worker.py)
+    FEED_PAGE_SIZE = 500
+    FEED_MAX_PAGE_SIZE = 5000
+    FEED_SETTLE_SECONDS = 2  # hold back the newest events so late commits with lower sequences aren't skipped
+    FEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'feed')
+    FEED_SEGMENT_EVENTS = 10000
+    FEED_POLL_INTERVAL = 5  # seconds
+    FEED_STREAM_SECONDS = 300  # /api/feed/stream closes after this; clients reconnect with ?after=
+    FEED_STREAM_POLL_INTERVAL = 1  # seconds
+    FEED_STREAM_HEARTBEAT = 15  # seconds between blank keep-alive lines
+    
+    # Pre-fork warm-up (wsgi.py): optional subsystems to import before workers
+    # fork, so they are shared; the rest load on first use. 'media', 'analytics'
+    WARM_SUBSYSTEMS = []
+    
+    # ASGI serving mode (asgi.py): async handlers for the feed and attachment
+    # transfers, everything else runs on the sync blueprints in a thread pool
+    ASGI_WSGI_THREADS = 16
+    
+    # Department work queue (see Complaint.refresh_due_at and Complaint.claim_next)
+    WORK_QUEUE_TARGET_HOURS = {'Urgent': 4, 'High': 24, 'Medium': 72, 'Low': 168}
+    WORK_QUEUE_LEASE_MINUTES = 30
+    WORK_QUEUE_CLAIM_CANDIDATES = 5
+    
+    # Complaint timeline settings
+    TIMELINE_PAGE_SIZE = 20
+    
+    # Email notification settings (delivered by notification_worker.py)
+    MAIL_TRANSPORT = os.environ.get('MAIL_TRANSPORT') or 'file'  # smtp, file
+    MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'localhost'
+    MAIL_PORT = int(os.environ.get('MAIL_PORT') or 1025)
+    MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', '').lower() in ('1', 'true', 'yes')
+    MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
+    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'noreply@klu.ac.in'
+    MAIL_FILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'mail')
+    NOTIFICATION_BATCH_SIZE = 100
+    NOTIFICATION_MAX_ATTEMPTS = 6
+    NOTIFICATION_RETRY_BASE_SECONDS = 60
+    NOTIFICATION_POLL_INTERVAL = 10  # seconds
+    
+    # Near-duplicate clustering window (new complaints match the current and previous window)
+    CLUSTER_WINDOW_HOURS = 6
+    
+    # Admission control for expensive writes (POST only; see services/admission.py)
+    # rate = tokens per second, burst = bucket size
+    ADMISSION_LIMITS = {
+        'auth.login': {
+            'concurrency': 4, 'queue': 16,
+            'ip_rate': 1.0, 'ip_burst': 20,
+            'user_rate': 0.1, 'user_burst': 5
+        },
+        'student.submit_complaint': {
+            'concurrency': 2, 'queue': 8,
+            'ip_rate': 0.5, 'ip_burst': 20,
+            'user_rate': 0.05, 'user_burst': 3
+        }
+    }
+    ADMISSION_QUEUE_TIMEOUT = 2.0  # seconds a request may wait for a slot
+    ADMISSION_RETRY_AFTER = 5  # seconds suggested to shed clients
+    ADMISSION_BACKEND = os.environ.get('ADMISSION_BACKEND') or 'memory'  # memory, shared
+    ADMISSION_SHARED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'admission.bin')
+    ADMISSION_SHARED_SLOTS = 65536
+    
+    # Columnar analytics snapshots (written by analytics_snapshot.py)
+    ANALYTICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'analytics')
+    ANALYTICS_SNAPSHOT_INTERVAL = 15 * 60  # seconds
     
     # Session settings
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
@@ -20,3 +109,14 @@ class Config:
     
     # University email domain
     UNIVERSITY_EMAIL_DOMAIN = 'klu.ac.in'
+    
+    # Campuses served by this deployment, keyed by campus code. The login email
+    # domain selects the campus; each campus has its own database and pool.
+    # database_uri None means SQLALCHEMY_DATABASE_URI for the default campus and
+    # sqlite:///campus_<code>.db otherwise. For PostgreSQL schemas use e.g.
+    # postgresql://.../portal?options=-csearch_path%3Dcampus2
+    CAMPUSES = {
+        'klu': {'name': 'KL University', 'domain': UNIVERSITY_EMAIL_DOMAIN, 'database_uri': None},
+    }
+    DEFAULT_CAMPUS = 'klu'
+    CAMPUS_ROLLUP_TIMEOUT = 10  # seconds to wait for each campus in the admin rollup
@@ -1,9 +1,16 @@
 -- Student Complaint Portal Database Schema
 
 -- Drop tables if they exist (for clean setup)
+DROP TABLE IF EXISTS feed_consumers CASCADE;
+DROP TABLE IF EXISTS complaint_events CASCADE;
+DROP TABLE IF EXISTS complaint_reads CASCADE;
+DROP TABLE IF EXISTS intake_keys CASCADE;
+DROP TABLE IF EXISTS notification_outbox CASCADE;
 DROP TABLE IF EXISTS complaint_updates CASCADE;
 DROP TABLE IF EXISTS attachments CASCADE;
 DROP TABLE IF EXISTS complaints CASCADE;
+DROP TABLE IF EXISTS cluster_buckets CASCADE;
+DROP TABLE IF EXISTS complaint_clusters CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 DROP TABLE IF EXISTS departments CASCADE;
 
@@ -31,6 +38,25 @@ CREATE TABLE users (
     last_login TIMESTAMP
 );
 
+-- Complaint Clusters (near-duplicate complaints grouped at submit time)
+CREATE TABLE complaint_clusters (
+    id SERIAL PRIMARY KEY,
+    department_id INTEGER NOT NULL REFERENCES departments(id) ON DELETE CASCADE,
+    room_block VARCHAR(20),
+    size INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Cluster Buckets (LSH band index used to find matching clusters)
+CREATE TABLE cluster_buckets (
+    id SERIAL PRIMARY KEY,
+    department_id INTEGER NOT NULL REFERENCES departments(id) ON DELETE CASCADE,
+    time_window INTEGER NOT NULL,
+    band_hash BIGINT NOT NULL,
+    cluster_id INTEGER NOT NULL REFERENCES complaint_clusters(id) ON DELETE CASCADE
+);
+
 -- Complaints Table
 CREATE TABLE complaints (
     id SERIAL PRIMARY KEY,
@@ -41,10 +67,19 @@ CREATE TABLE complaints (
     description TEXT NOT NULL,
     status VARCHAR(50) DEFAULT 'Pending' CHECK (status IN ('Pending', 'In Progress', 'Completed', 'Closed')),
     priority VARCHAR(50) DEFAULT 'Medium' CHECK (priority IN ('Low', 'Medium', 'High', 'Urgent')),
+    cluster_id INTEGER REFERENCES complaint_clusters(id) ON DELETE SET NULL,
+    room_number VARCHAR(20),
     expected_resolution_date DATE,
     resolved_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    version INTEGER NOT NULL DEFAULT 1,
+    last_update_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_update_type VARCHAR(50) DEFAULT 'created',
+    reply_count INTEGER NOT NULL DEFAULT 0,
+    due_at TIMESTAMP,
+    claimed_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    claim_expires_at TIMESTAMP
 );
 
 -- Complaint Updates (Replies and Status Updates)
@@ -65,7 +100,87 @@ CREATE TABLE attachments (
     file_path VARCHAR(500) NOT NULL,
     file_type VARCHAR(50),
     file_size INTEGER,
-    uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    thumbnail_path VARCHAR(500),
+    preview_path VARCHAR(500),
+    poster_path VARCHAR(500),
+    derivative_status VARCHAR(20) DEFAULT 'pending'
+);
+
+-- Notification Outbox (drained by notification_worker.py)
+CREATE TABLE notification_outbox (
+    id SERIAL PRIMARY KEY,
+    recipient VARCHAR(255) NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    ticket_id VARCHAR(20) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    message TEXT NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed')),
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Intake Keys (idempotency keys for the batch intake API)
+CREATE TABLE intake_keys (
+    id SERIAL PRIMARY KEY,
+    key VARCHAR(100) NOT NULL,
+    created_by INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    complaint_id INTEGER NOT NULL REFERENCES complaints(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_intake_keys_creator_key UNIQUE (created_by, key)
+);
+
+-- Complaint Reads (when each user last opened a complaint, for unread badges)
+CREATE TABLE complaint_reads (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    complaint_id INTEGER NOT NULL REFERENCES complaints(id) ON DELETE CASCADE,
+    last_read_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, complaint_id)
+);
+
+-- Complaint Events (append-only change-data feed; id is the sequence number)
+CREATE TABLE complaint_events (
+    id SERIAL PRIMARY KEY,
+    event_type VARCHAR(50) NOT NULL CHECK (event_type IN ('created', 'status_change', 'priority_change', 'reply')),
+    complaint_id INTEGER NOT NULL,
+    ticket_id VARCHAR(20) NOT NULL,
+    department_id INTEGER,
+    actor_id INTEGER,
+    payload TEXT NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Feed Consumers (registered feed readers and their acknowledged position)
+CREATE TABLE feed_consumers (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    token_hash VARCHAR(64) UNIQUE,
+    acked_sequence INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen_at TIMESTAMP
+);
+
+-- Complaint Stats (running per-student and per-room counters, per department;
+-- resolved_* columns are a resolution-time histogram; rebuilt by rebuild_stats.py)
+CREATE TABLE complaint_stats (
+    scope VARCHAR(10) NOT NULL CHECK (scope IN ('student', 'room')),
+    scope_key VARCHAR(50) NOT NULL,
+    department_id INTEGER NOT NULL REFERENCES departments(id) ON DELETE CASCADE,
+    open_count INTEGER NOT NULL DEFAULT 0,
+    resolved_count INTEGER NOT NULL DEFAULT 0,
+    resolved_4h INTEGER NOT NULL DEFAULT 0,
+    resolved_12h INTEGER NOT NULL DEFAULT 0,
+    resolved_1d INTEGER NOT NULL DEFAULT 0,
+    resolved_2d INTEGER NOT NULL DEFAULT 0,
+    resolved_3d INTEGER NOT NULL DEFAULT 0,
+    resolved_1w INTEGER NOT NULL DEFAULT 0,
+    resolved_2w INTEGER NOT NULL DEFAULT 0,
+    resolved_later INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (scope, scope_key, department_id)
 );
 
 -- Create indexes for better performance
@@ -73,9 +188,19 @@ CREATE INDEX idx_complaints_student ON complaints(student_id);
 CREATE INDEX idx_complaints_department ON complaints(department_id);
 CREATE INDEX idx_complaints_status ON complaints(status);
 CREATE INDEX idx_complaints_ticket ON complaints(ticket_id);
+CREATE INDEX idx_complaints_student_activity ON complaints(student_id, last_update_at);
+CREATE INDEX idx_complaints_department_activity ON complaints(department_id, last_update_at);
+CREATE INDEX idx_complaints_queue ON complaints(department_id, due_at, id) WHERE due_at IS NOT NULL;
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_role ON users(role);
-CREATE INDEX idx_complaint_updates_complaint ON complaint_updates(complaint_id);
+CREATE INDEX idx_users_created ON users(created_at, id);
+CREATE INDEX idx_users_role_created ON users(role, created_at, id);
+CREATE INDEX idx_users_name_lower ON users(lower(name));
+CREATE INDEX idx_users_registration ON users(registration_number);
+CREATE INDEX idx_complaint_updates_complaint_created ON complaint_updates(complaint_id, created_at);
+CREATE INDEX idx_complaint_clusters_department ON complaint_clusters(department_id, size, last_seen_at);
+CREATE INDEX idx_cluster_buckets_lookup ON cluster_buckets(department_id, time_window, band_hash);
+CREATE INDEX idx_notification_outbox_pending ON notification_outbox(status, next_attempt_at);
 
 -- Insert default departments
 INSERT INTO departments (name, email, description) VALUES
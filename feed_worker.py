@@ -0,0 +1,70 @@
+"""Feed worker - tails complaint events into NDJSON segments and compacts acknowledged ones"""
+import argparse
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models.campus import campus_context
+from models.feed import FeedConsumer
+from services.feed import export_events, compact
+
+def register_consumer(name, campus=None):
+    """Register a feed consumer and print its API token"""
+    app = create_app(web=False)
+    campus = campus or app.config['DEFAULT_CAMPUS']
+
+    with campus_context(app, campus):
+        if FeedConsumer.query.filter_by(name=name).first():
+            print(f"❌ Consumer '{name}' already exists")
+            return
+        _, token = FeedConsumer.register(name, token_prefix=f'{campus}.')
+
+    print(f"✅ Registered feed consumer '{name}' on {campus}")
+    print(f"🔑 Token (shown once): {token}")
+    print("   Send it as 'Authorization: Bearer <token>' to /api/feed/events")
+
+def run_worker(once=False):
+    """Export and compact every campus's feed until interrupted"""
+    app = create_app(web=False)
+    interval = app.config['FEED_POLL_INTERVAL']
+    print(f"📰 Feed worker started ({len(app.config['CAMPUSES'])} campus(es))")
+
+    while True:
+        exported = 0
+        for campus in app.config['CAMPUSES']:
+            with campus_context(app, campus):
+                directory = os.path.join(app.config['FEED_DIR'], campus)
+                written = export_events(directory)
+                rows, segments = compact(directory)
+                if written:
+                    print(f"✅ {campus}: exported {written} event(s)")
+                if rows or segments:
+                    print(f"🧹 {campus}: compacted {rows} event(s), {segments} segment(s)")
+                exported += written
+
+        # Keep exporting while there is a backlog
+        if exported:
+            continue
+        if once:
+            break
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--once', action='store_true', help='export pending events and exit')
+    parser.add_argument('--register', metavar='NAME', help='register a feed consumer and print its token')
+    parser.add_argument('--campus', help='campus for --register (default: DEFAULT_CAMPUS)')
+    args = parser.parse_args()
+
+    if args.register:
+        register_consumer(args.register, args.campus)
+        sys.exit()
+
+    try:
+        run_worker(once=args.once)
+    except KeyboardInterrupt:
+        print("👋 Feed worker stopped")
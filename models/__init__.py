@@ -1,12 +1,24 @@
 """Models package initialization"""
+import importlib
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from models.campus import CampusSession, configure_campus_binds
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': CampusSession})
 login_manager = LoginManager()
 
+# Every module that defines tables, so create_all and mapper configuration
+# see the whole schema even when no blueprint has been imported
+MODEL_MODULES = ['user', 'department', 'cluster', 'complaint', 'feed', 'intake', 'notification', 'stats']
+
+def import_models():
+    for name in MODEL_MODULES:
+        importlib.import_module(f'models.{name}')
+
 def init_app(app):
     """Initialize database and login manager"""
+    configure_campus_binds(app)
+    import_models()
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
@@ -0,0 +1,68 @@
+"""Campus tenancy.
+
+Each campus listed in ``CAMPUSES`` has its own database. The default campus
+uses ``SQLALCHEMY_DATABASE_URI``; every other campus is registered as a
+Flask-SQLAlchemy bind with its own engine and connection pool. A request is
+pinned to one campus (from the login email domain, then from the logged-in
+user's ID) and ``CampusSession`` sends every query in it to that campus's
+engine, so users, departments, complaints and their attachments never mix.
+"""
+from contextlib import contextmanager
+from flask import current_app, g
+from flask_sqlalchemy.session import Session
+
+
+def configure_campus_binds(app):
+    """Register one SQLAlchemy bind per non-default campus (call before db.init_app)"""
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for code, campus in app.config['CAMPUSES'].items():
+        if code == app.config['DEFAULT_CAMPUS']:
+            continue
+        uri = campus.get('database_uri') or f'sqlite:///campus_{code}.db'
+        binds[code] = dict(campus.get('engine_options') or {}, url=uri)
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def current_campus():
+    """Campus code the current request or job is pinned to"""
+    return g.get('campus') or current_app.config['DEFAULT_CAMPUS']
+
+
+def use_campus(code):
+    """Pin the current app context to a campus"""
+    if code not in current_app.config['CAMPUSES']:
+        raise KeyError(f'Unknown campus: {code}')
+    g.campus = code
+
+
+@contextmanager
+def campus_context(app, code):
+    """App context pinned to one campus, for background jobs and fan-out queries"""
+    with app.app_context():
+        use_campus(code)
+        yield
+
+
+def campus_for_email(email):
+    """Campus code whose domain matches the email address, or None"""
+    domain = email.rsplit('@', 1)[-1].lower()
+    for code, campus in current_app.config['CAMPUSES'].items():
+        if campus['domain'] == domain:
+            return code
+    return None
+
+
+def campus_bind_key(code):
+    """SQLAlchemy bind key for a campus (None is the default database)"""
+    return None if code == current_app.config['DEFAULT_CAMPUS'] else code
+
+
+class CampusSession(Session):
+    """Session that routes every model to the current campus's engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            key = campus_bind_key(current_campus())
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,53 @@
+"""Complaint cluster models"""
+from datetime import datetime
+from models import db
+
+class ComplaintCluster(db.Model):
+    """A group of near-duplicate complaints for one department"""
+    __tablename__ = 'complaint_clusters'
+
+    id = db.Column(db.Integer, primary_key=True)
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=False)
+    room_block = db.Column(db.String(20))
+    size = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    complaints = db.relationship('Complaint', backref='cluster', lazy='dynamic')
+
+    __table_args__ = (
+        db.Index('idx_complaint_clusters_department', 'department_id', 'size', 'last_seen_at'),
+    )
+
+    def get_open_complaints(self):
+        """Get complaints in this cluster that still need action"""
+        from models.complaint import Complaint
+        return self.complaints.filter(
+            Complaint.status.notin_(['Completed', 'Closed'])
+        ).order_by(Complaint.created_at).all()
+
+    def __repr__(self):
+        return f'<ComplaintCluster {self.id} ({self.size})>'
+
+
+class ClusterBucket(db.Model):
+    """One LSH band of a complaint's MinHash signature, pointing at its cluster.
+
+    Lookups are by (department, time window, band hash), so finding candidate
+    clusters for a new complaint never scans older complaints.
+    """
+    __tablename__ = 'cluster_buckets'
+
+    id = db.Column(db.Integer, primary_key=True)
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=False)
+    time_window = db.Column(db.Integer, nullable=False)
+    band_hash = db.Column(db.BigInteger, nullable=False)
+    cluster_id = db.Column(db.Integer, db.ForeignKey('complaint_clusters.id', ondelete='CASCADE'), nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_cluster_buckets_lookup', 'department_id', 'time_window', 'band_hash'),
+    )
+
+    def __repr__(self):
+        return f'<ClusterBucket {self.band_hash} -> {self.cluster_id}>'
@@ -1,9 +1,28 @@
 """Complaint model"""
-from datetime import datetime
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
 from models import db
+from models.notification import NotificationOutbox
+from models.feed import ComplaintEvent
+from models.stats import ComplaintStats
 import random
 import string
 
+# Bootstrap badge classes
+STATUS_COLORS = {
+    'Pending': 'warning',
+    'In Progress': 'info',
+    'Completed': 'success',
+    'Closed': 'secondary'
+}
+PRIORITY_COLORS = {
+    'Low': 'success',
+    'Medium': 'info',
+    'High': 'warning',
+    'Urgent': 'danger'
+}
+
 class Complaint(db.Model):
     __tablename__ = 'complaints'
     
@@ -15,36 +34,78 @@ class Complaint(db.Model):
     description = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(50), default='Pending')
     priority = db.Column(db.String(50), default='Medium')
+    cluster_id = db.Column(db.Integer, db.ForeignKey('complaint_clusters.id'))
+    room_number = db.Column(db.String(20))  # filer's room when the complaint was filed
     expected_resolution_date = db.Column(db.Date)
     resolved_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    
+    # Denormalized activity summary so list pages never load the timeline
+    last_update_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_update_type = db.Column(db.String(50), default='created')  # created, reply, status_change
+    reply_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Work queue: open complaints are served in due_at order (NULL once closed),
+    # and a claim is a lease that lapses at claim_expires_at
+    due_at = db.Column(db.DateTime)
+    claimed_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    claim_expires_at = db.Column(db.DateTime)
+    
+    # Every ORM UPDATE checks and bumps the version, so a write based on a stale read fails
+    __mapper_args__ = {'version_id_col': version}
+    
+    __table_args__ = (
+        db.Index('idx_complaints_student_activity', 'student_id', 'last_update_at'),
+        db.Index('idx_complaints_department_activity', 'department_id', 'last_update_at'),
+        db.Index('idx_complaints_queue', 'department_id', 'due_at', 'id',
+                 sqlite_where=db.text('due_at IS NOT NULL'), postgresql_where=db.text('due_at IS NOT NULL')),
+    )
     
     # Relationships
-    updates = db.relationship('ComplaintUpdate', backref='complaint', lazy=True, cascade='all, delete-orphan')
-    attachments = db.relationship('Attachment', backref='complaint', lazy=True, cascade='all, delete-orphan')
+    # Updates are query-backed so the timeline can be paged instead of loaded whole
+    updates = db.relationship('ComplaintUpdate', backref='complaint', lazy='dynamic', cascade='all, delete-orphan',
+                              order_by=lambda: (ComplaintUpdate.created_at.desc(), ComplaintUpdate.id.desc()))
+    claimer = db.relationship('User', foreign_keys=[claimed_by])
+    attachments = db.relationship('Attachment', backref='complaint', lazy=True, cascade='all, delete-orphan',
+                                  order_by=lambda: Attachment.uploaded_at)
     
     @staticmethod
     def generate_ticket_id():
         """Generate unique ticket ID"""
-        while True:
+        return Complaint.generate_ticket_ids(1)[0]
+    
+    @staticmethod
+    def generate_ticket_ids(count):
+        """Generate ``count`` unique ticket IDs, checking each round of candidates in one query"""
+        ticket_ids = set()
+        while len(ticket_ids) < count:
             # Format: TCK-YYYYMMDD-XXXX (e.g., TCK-20250115-A1B2)
             date_str = datetime.now().strftime('%Y%m%d')
-            random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-            ticket_id = f'TCK-{date_str}-{random_str}'
+            candidates = {
+                f"TCK-{date_str}-{''.join(random.choices(string.ascii_uppercase + string.digits, k=4))}"
+                for _ in range(count - len(ticket_ids))
+            } - ticket_ids
             
-            # Check if ticket ID already exists
-            if not Complaint.query.filter_by(ticket_id=ticket_id).first():
-                return ticket_id
+            # Drop any that already exist
+            taken = {
+                ticket_id for (ticket_id,) in
+                db.session.query(Complaint.ticket_id).filter(Complaint.ticket_id.in_(candidates))
+            }
+            ticket_ids |= candidates - taken
+        return list(ticket_ids)
     
-    def update_status(self, new_status, user_id, message=None):
+    def update_status(self, new_status, user_id, message=None, commit=True):
         """Update complaint status"""
         old_status = self.status
+        old_resolved_at = self.resolved_at
         self.status = new_status
-        self.updated_at = datetime.utcnow()
+        self.record_update('status_change')
         
         if new_status == 'Completed':
             self.resolved_at = datetime.utcnow()
+        ComplaintStats.complaint_changed(self, old_status, old_resolved_at)
         
         # Create status update record
         update = ComplaintUpdate(
@@ -54,32 +115,226 @@ class Complaint(db.Model):
             update_type='status_change'
         )
         db.session.add(update)
+        NotificationOutbox.enqueue(self.student.email, 'status_change', self, update.message)
+        ComplaintEvent.record(self, 'status_change', user_id, old=old_status, new=new_status, message=update.message)
+        if commit:
+            db.session.commit()
+    
+    def touch(self, update_type='reply'):
+        """Record activity on the complaint without a read-modify-write.
+
+        Used for replies, which never conflict with state changes: the atomic
+        UPDATE bumps the version and activity counters, but can't fail on a
+        stale read.
+        """
+        now = datetime.utcnow()
+        values = {
+            'updated_at': now,
+            'last_update_at': now,
+            'last_update_type': update_type,
+            'version': Complaint.version + 1
+        }
+        if update_type == 'reply':
+            values['reply_count'] = Complaint.reply_count + 1
+        Complaint.query.filter_by(id=self.id).update(values, synchronize_session=False)
+    
+    def record_update(self, update_type):
+        """Update the activity summary and queue position for a change made through the ORM"""
+        now = datetime.utcnow()
+        self.updated_at = now
+        self.last_update_at = now
+        self.last_update_type = update_type
+        self.refresh_due_at()
+    
+    def refresh_due_at(self):
+        """Recompute the work queue position after a status, priority or date change.
+        
+        A complaint is due its priority's target time after it was filed, or at
+        the end of its expected resolution date if that is sooner. Ordering by
+        this deadline ages old low-priority complaints past newer urgent ones
+        without ever rewriting rows. Closed complaints leave the queue.
+        """
+        if self.status in ['Completed', 'Closed']:
+            self.due_at = None
+            return
+        
+        target_hours = current_app.config['WORK_QUEUE_TARGET_HOURS']
+        filed = self.created_at or datetime.utcnow()
+        self.due_at = filed + timedelta(hours=target_hours.get(self.priority or 'Medium', target_hours['Medium']))
+        if self.expected_resolution_date:
+            self.due_at = min(self.due_at, datetime.combine(self.expected_resolution_date, datetime.min.time()) + timedelta(days=1))
+    
+    @property
+    def is_claimed(self):
+        return self.claim_expires_at is not None and self.claim_expires_at > datetime.utcnow()
+    
+    @staticmethod
+    def claim_next(department_id, user_id):
+        """Lease the most urgent unclaimed open complaint in a department to a staff user.
+        
+        A user who already holds a claim gets it back with the lease renewed,
+        so retries never take a second ticket. Returns None when nothing is
+        left to claim.
+        """
+        now = datetime.utcnow()
+        expires = now + timedelta(minutes=current_app.config['WORK_QUEUE_LEASE_MINUTES'])
+        unclaimed = db.or_(Complaint.claim_expires_at.is_(None), Complaint.claim_expires_at <= now)
+        queued = db.and_(
+            Complaint.department_id == department_id,
+            Complaint.due_at.isnot(None),
+            Complaint.status.notin_(['Completed', 'Closed'])
+        )
+        
+        held = Complaint.query.filter(
+            queued,
+            Complaint.claimed_by == user_id,
+            Complaint.claim_expires_at > now
+        ).order_by(Complaint.due_at).first()
+        if held:
+            Complaint.query.filter_by(id=held.id).update({'claim_expires_at': expires}, synchronize_session=False)
+            db.session.commit()
+            return db.session.get(Complaint, held.id, populate_existing=True)
+        
+        # One walk of idx_complaints_queue in due order, skipping leased rows
+        available = db.session.query(Complaint.id).filter(queued, unclaimed).order_by(Complaint.due_at, Complaint.id)
+        
+        if db.session.get_bind().dialect.name == 'postgresql':
+            # Rows being claimed by other transactions are skipped, not waited on
+            candidates = available.limit(1).with_for_update(skip_locked=True).all()
+        else:
+            # SQLite serializes writers, so the conditional UPDATE below decides races
+            # (it re-checks that the ticket is still queued as well as unclaimed)
+            candidates = available.limit(current_app.config['WORK_QUEUE_CLAIM_CANDIDATES']).all()
+        
+        for (complaint_id,) in candidates:
+            claimed = Complaint.query.filter(Complaint.id == complaint_id, queued, unclaimed).update(
+                {'claimed_by': user_id, 'claim_expires_at': expires},
+                synchronize_session=False
+            )
+            if claimed:
+                db.session.commit()
+                return db.session.get(Complaint, complaint_id, populate_existing=True)
+        
         db.session.commit()
+        return None
+    
+    def release_claim(self, user_id):
+        """Give up a claim held by the user; returns False if they didn't hold it"""
+        released = Complaint.query.filter_by(id=self.id, claimed_by=user_id).update(
+            {'claimed_by': None, 'claim_expires_at': None},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return bool(released)
+    
+    def is_unread_for(self, last_read_at):
+        """Whether there is activity newer than the user's read marker"""
+        return is_unread(self.last_update_at, last_read_at)
+    
+    def find_conflicts(self, seen_version, seen, changes):
+        """Fields in ``changes`` that someone else changed after the user loaded ``seen_version``.
+
+        ``seen`` maps field names to the values the user was shown. A field
+        only conflicts if it moved since then and the user wants it to be
+        something else, so concurrent edits to different fields (or to the
+        same value) merge automatically.
+        """
+        if seen_version is None or seen_version == self.version:
+            return []
+        
+        conflicts = []
+        for field, new_value in changes.items():
+            current = _form_value(getattr(self, field))
+            if current != _form_value(new_value) and current != seen.get(field, current):
+                conflicts.append(field)
+        return conflicts
+    
+    def get_timeline(self, before=None, after=None, limit=None):
+        """Get a page of updates, newest first.
+
+        ``before`` and ``after`` are update IDs used as cursors: ``before``
+        pages back through older entries, ``after`` returns only entries newer
+        than the one the client already has. Returns ``(updates, has_more)``.
+        """
+        limit = limit or current_app.config['TIMELINE_PAGE_SIZE']
+        query = self.updates.options(db.joinedload(ComplaintUpdate.user))
+        
+        cursor_id = before or after
+        if cursor_id:
+            cursor = db.session.query(ComplaintUpdate.created_at, ComplaintUpdate.id).filter_by(
+                id=int(cursor_id), complaint_id=self.id
+            ).first()
+            if cursor is None:
+                return [], False
+            
+            key = db.tuple_(ComplaintUpdate.created_at, ComplaintUpdate.id)
+            if before:
+                query = query.filter(key < tuple(cursor))
+            else:
+                # Walk forward from the cursor so no entry is skipped, then flip to newest first
+                query = query.filter(key > tuple(cursor)).order_by(None).order_by(
+                    ComplaintUpdate.created_at, ComplaintUpdate.id
+                )
+                updates = query.limit(limit + 1).all()
+                return updates[:limit][::-1], len(updates) > limit
+        
+        updates = query.limit(limit + 1).all()
+        return updates[:limit], len(updates) > limit
     
     def get_status_color(self):
         """Get color class for status"""
-        colors = {
-            'Pending': 'warning',
-            'In Progress': 'info',
-            'Completed': 'success',
-            'Closed': 'secondary'
-        }
-        return colors.get(self.status, 'secondary')
+        return STATUS_COLORS.get(self.status, 'secondary')
     
     def get_priority_color(self):
         """Get color class for priority"""
-        colors = {
-            'Low': 'success',
-            'Medium': 'info',
-            'High': 'warning',
-            'Urgent': 'danger'
-        }
-        return colors.get(self.priority, 'secondary')
+        return PRIORITY_COLORS.get(self.priority, 'secondary')
     
     def __repr__(self):
         return f'<Complaint {self.ticket_id}>'
 
 
+class ComplaintRead(db.Model):
+    """Per-user read marker for a complaint's timeline"""
+    __tablename__ = 'complaint_reads'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaints.id', ondelete='CASCADE'), primary_key=True)
+    last_read_at = db.Column(db.DateTime, nullable=False)
+    
+    @staticmethod
+    def mark_read(user_id, complaint_id, commit=True):
+        """Move the user's read marker to now"""
+        read = db.session.get(ComplaintRead, (user_id, complaint_id))
+        if read is None:
+            read = ComplaintRead(user_id=user_id, complaint_id=complaint_id)
+            db.session.add(read)
+        read.last_read_at = datetime.utcnow()
+        
+        if commit:
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another request for the same user created the marker first
+                db.session.rollback()
+    
+    def __repr__(self):
+        return f'<ComplaintRead {self.user_id}:{self.complaint_id}>'
+
+
+def is_unread(last_update_at, last_read_at):
+    """Whether activity at ``last_update_at`` is newer than a read marker"""
+    return last_update_at is not None and (last_read_at is None or last_update_at > last_read_at)
+
+
+def _form_value(value):
+    """Normalize a column value to how it appears in an HTML form"""
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
 class ComplaintUpdate(db.Model):
     __tablename__ = 'complaint_updates'
     
@@ -90,6 +345,10 @@ class ComplaintUpdate(db.Model):
     update_type = db.Column(db.String(50), default='comment')  # comment, status_change, reply
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_complaint_updates_complaint_created', 'complaint_id', 'created_at'),
+    )
+    
     def __repr__(self):
         return f'<ComplaintUpdate {self.id}>'
 
@@ -105,5 +364,23 @@ class Attachment(db.Model):
     file_size = db.Column(db.Integer)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Derivatives written by services.media (paths relative to UPLOAD_FOLDER)
+    thumbnail_path = db.Column(db.String(500))
+    preview_path = db.Column(db.String(500))
+    poster_path = db.Column(db.String(500))
+    derivative_status = db.Column(db.String(20), default='pending')  # pending, ready, none, failed
+    
+    @property
+    def is_image(self):
+        return self.file_type in ['png', 'jpg', 'jpeg', 'gif']
+    
+    @property
+    def is_video(self):
+        return self.file_type in ['mp4', 'avi', 'mov']
+    
+    def get_view_path(self):
+        """Smallest file suitable for viewing on screen (falls back to the original)"""
+        return self.preview_path or self.file_path
+    
     def __repr__(self):
         return f'<Attachment {self.file_name}>'
@@ -0,0 +1,148 @@
+"""Change-data feed models"""
+import hashlib
+import json
+import secrets
+from datetime import datetime, timedelta
+from models import db
+
+class ComplaintEvent(db.Model):
+    """Append-only log of complaint activity for external consumers.
+
+    Rows are added in the same transaction as the change they describe, and
+    the primary key is the feed sequence number, so consumers resume with
+    ``after=<last sequence>`` and only ever read new rows.
+    """
+    __tablename__ = 'complaint_events'
+
+    id = db.Column(db.Integer, primary_key=True)  # feed sequence number
+    event_type = db.Column(db.String(50), nullable=False)  # created, status_change, priority_change, reply
+    complaint_id = db.Column(db.Integer, nullable=False)
+    ticket_id = db.Column(db.String(20), nullable=False)
+    department_id = db.Column(db.Integer)
+    actor_id = db.Column(db.Integer)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Never reuse sequence numbers after compaction empties the table
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    @staticmethod
+    def record(complaint, event_type, actor_id=None, **data):
+        """Add an event to the current transaction (caller commits)"""
+        event = ComplaintEvent(
+            event_type=event_type,
+            complaint_id=complaint.id,
+            ticket_id=complaint.ticket_id,
+            department_id=complaint.department_id,
+            actor_id=actor_id,
+            payload=json.dumps(data, default=str)
+        )
+        db.session.add(event)
+        return event
+
+    @staticmethod
+    def created(complaint, actor_id):
+        return ComplaintEvent.record(
+            complaint, 'created', actor_id,
+            subject=complaint.subject,
+            status=complaint.status,
+            priority=complaint.priority,
+            student_id=complaint.student_id
+        )
+
+    @staticmethod
+    def after_statement(sequence, limit, settle_seconds=0):
+        """SELECT for up to ``limit + 1`` events after a sequence (shared with the async API)"""
+        statement = db.select(ComplaintEvent).where(ComplaintEvent.id > sequence)
+        if settle_seconds:
+            statement = statement.where(ComplaintEvent.created_at <= datetime.utcnow() - timedelta(seconds=settle_seconds))
+        return statement.order_by(ComplaintEvent.id).limit(limit + 1)
+
+    @staticmethod
+    def newest_sequence_statement():
+        """SELECT for the highest sequence handed out so far (shared with the async API).
+
+        Compaction may have deleted the newest events, so acknowledged
+        positions count too.
+        """
+        known = db.union_all(
+            db.select(db.func.max(ComplaintEvent.id).label('sequence')),
+            db.select(db.func.max(FeedConsumer.acked_sequence).label('sequence'))
+        ).subquery()
+        return db.select(db.func.coalesce(db.func.max(known.c.sequence), 0))
+
+    @staticmethod
+    def read_after(sequence, limit, settle_seconds=0):
+        """Events with sequence > ``sequence`` in order, returned as (events, has_more).
+
+        Events younger than ``settle_seconds`` are held back so a transaction
+        that took a lower sequence number but commits later is never skipped.
+        """
+        events = db.session.scalars(ComplaintEvent.after_statement(sequence, limit, settle_seconds)).all()
+        return events[:limit], len(events) > limit
+
+    def to_dict(self):
+        return {
+            'sequence': self.id,
+            'type': self.event_type,
+            'complaint_id': self.complaint_id,
+            'ticket_id': self.ticket_id,
+            'department_id': self.department_id,
+            'actor_id': self.actor_id,
+            'created_at': self.created_at.isoformat(),
+            'data': json.loads(self.payload)
+        }
+
+    def to_json(self):
+        """One compact NDJSON line (without the newline)"""
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    def __repr__(self):
+        return f'<ComplaintEvent {self.id} {self.event_type} {self.ticket_id}>'
+
+
+class FeedConsumer(db.Model):
+    """A registered reader of the change-data feed and how far it has acknowledged"""
+    __tablename__ = 'feed_consumers'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    token_hash = db.Column(db.String(64), unique=True)
+    acked_sequence = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime)
+
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def register(name, token_prefix=''):
+        """Create a consumer and return (consumer, token); the token is only shown once"""
+        token = f'{token_prefix}{secrets.token_urlsafe(32)}'
+        consumer = FeedConsumer(name=name, token_hash=FeedConsumer.hash_token(token))
+        db.session.add(consumer)
+        db.session.commit()
+        return consumer, token
+
+    @staticmethod
+    def token_statement(token):
+        return db.select(FeedConsumer).where(FeedConsumer.token_hash == FeedConsumer.hash_token(token))
+
+    @staticmethod
+    def from_token(token):
+        return db.session.scalars(FeedConsumer.token_statement(token)).first()
+
+    def ack(self, sequence):
+        """Move the acknowledged position forward (never backward)"""
+        self.acked_sequence = max(self.acked_sequence, int(sequence))
+        self.last_seen_at = datetime.utcnow()
+
+    @staticmethod
+    def compaction_point():
+        """Highest sequence every registered consumer has acknowledged (0 when none are registered)"""
+        return db.session.query(db.func.min(FeedConsumer.acked_sequence)).scalar() or 0
+
+    def __repr__(self):
+        return f'<FeedConsumer {self.name} @{self.acked_sequence}>'
+
@@ -0,0 +1,27 @@
+"""Batch intake idempotency model"""
+from datetime import datetime
+from models import db
+
+class IntakeKey(db.Model):
+    """Client-supplied idempotency key for a complaint entered through batch intake.
+
+    Retrying a batch with the same keys returns the original tickets instead
+    of creating duplicates.
+    """
+    __tablename__ = 'intake_keys'
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(100), nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaints.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    complaint = db.relationship('Complaint')
+
+    __table_args__ = (
+        db.UniqueConstraint('created_by', 'key', name='uq_intake_keys_creator_key'),
+    )
+
+    def __repr__(self):
+        return f'<IntakeKey {self.key}>'
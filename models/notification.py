@@ -0,0 +1,67 @@
+"""Notification outbox model"""
+from datetime import datetime
+from models import db
+
+class NotificationOutbox(db.Model):
+    """Email notifications waiting to be delivered by the notification worker.
+
+    Rows are added in the same transaction as the complaint change they
+    describe, so a notification exists if and only if the change committed.
+    """
+    __tablename__ = 'notification_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(255), nullable=False)
+    event_type = db.Column(db.String(50), nullable=False)  # complaint_created, reply, status_change
+    ticket_id = db.Column(db.String(20), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending, sent, failed
+    attempts = db.Column(db.Integer, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_notification_outbox_pending', 'status', 'next_attempt_at'),
+    )
+
+    @staticmethod
+    def enqueue(recipient, event_type, complaint, message):
+        """Add a notification to the current transaction (caller commits)"""
+        if not recipient:
+            return None
+
+        event = NotificationOutbox(
+            recipient=recipient,
+            event_type=event_type,
+            ticket_id=complaint.ticket_id,
+            subject=complaint.subject,
+            message=message
+        )
+        db.session.add(event)
+        return event
+
+    @staticmethod
+    def complaint_created(complaint):
+        """Notify the department that a complaint was filed"""
+        return NotificationOutbox.enqueue(
+            complaint.department.email,
+            'complaint_created',
+            complaint,
+            f'New {complaint.priority} priority complaint from {complaint.student.name} '
+            f'(Room {complaint.student.room_number or "N/A"}): {complaint.description}'
+        )
+
+    @staticmethod
+    def complaint_updated(complaint, user, message, event_type='reply'):
+        """Notify the other side of the conversation about a reply or status change"""
+        if user.is_student:
+            recipient = complaint.department.email
+        else:
+            recipient = complaint.student.email
+        return NotificationOutbox.enqueue(recipient, event_type, complaint, message)
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} {self.event_type} -> {self.recipient}>'
@@ -0,0 +1,61 @@
+"""Lightweight read-only rows for list pages"""
+from models import db
+from models.complaint import Complaint, ComplaintRead, STATUS_COLORS, PRIORITY_COLORS, is_unread
+from models.department import Department
+from models.user import User
+
+class ComplaintRow:
+    """Read-only complaint summary for list pages.
+
+    Built from a column-only query joined to users and departments, so list
+    pages skip ORM hydration, identity-map bookkeeping and the description
+    text. Badge classes are resolved once per row.
+    """
+    __slots__ = ('id', 'ticket_id', 'subject', 'status', 'priority', 'created_at',
+                 'last_update_at', 'last_update_type', 'reply_count',
+                 'student_name', 'room_number', 'department_name',
+                 'status_color', 'priority_color', 'unread')
+
+    COLUMNS = (
+        Complaint.id, Complaint.ticket_id, Complaint.subject, Complaint.status, Complaint.priority,
+        Complaint.created_at, Complaint.last_update_at, Complaint.last_update_type, Complaint.reply_count,
+        User.name, User.room_number, Department.name
+    )
+
+    def __init__(self, row, last_read_at=None):
+        (self.id, self.ticket_id, self.subject, self.status, self.priority, self.created_at,
+         self.last_update_at, self.last_update_type, self.reply_count,
+         self.student_name, self.room_number, self.department_name) = row
+        self.status_color = STATUS_COLORS.get(self.status, 'secondary')
+        self.priority_color = PRIORITY_COLORS.get(self.priority, 'secondary')
+        self.unread = is_unread(self.last_update_at, last_read_at)
+
+    @staticmethod
+    def query(reader_id=None):
+        """Column-only complaint query; with ``reader_id``, also selects that user's read marker.
+
+        Filter it with explicit ``Complaint.<column>`` expressions (``filter_by``
+        would apply to the last joined table).
+        """
+        columns = ComplaintRow.COLUMNS + ((ComplaintRead.last_read_at,) if reader_id else ())
+        query = db.session.query(*columns).select_from(Complaint).join(
+            User, Complaint.student_id == User.id
+        ).join(Department, Complaint.department_id == Department.id)
+
+        if reader_id:
+            query = query.outerjoin(ComplaintRead, db.and_(
+                ComplaintRead.complaint_id == Complaint.id,
+                ComplaintRead.user_id == reader_id
+            ))
+        return query
+
+    @staticmethod
+    def iterate(query, batch_size=500):
+        """Yield ComplaintRow objects from a ComplaintRow.query(), fetched in batches"""
+        width = len(ComplaintRow.COLUMNS)
+        with_marker = len(query.column_descriptions) > width
+        for row in query.yield_per(batch_size):
+            yield ComplaintRow(row[:width], row[width] if with_marker else None)
+
+    def __repr__(self):
+        return f'<ComplaintRow {self.ticket_id}>'
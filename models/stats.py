@@ -0,0 +1,185 @@
+"""Per-student and per-room complaint statistics"""
+from collections import Counter
+from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+
+CLOSED_STATUSES = ['Completed', 'Closed']
+
+# Resolution-time histogram as (upper bound in hours, column); the last bucket is open-ended
+RESOLUTION_BUCKETS = [
+    (4, 'resolved_4h'),
+    (12, 'resolved_12h'),
+    (24, 'resolved_1d'),
+    (48, 'resolved_2d'),
+    (72, 'resolved_3d'),
+    (168, 'resolved_1w'),
+    (336, 'resolved_2w'),
+    (None, 'resolved_later'),
+]
+
+
+def resolution_bucket(hours):
+    for upper, column in RESOLUTION_BUCKETS:
+        if upper is None or hours <= upper:
+            return column
+
+
+def contribution(status, created_at, resolved_at):
+    """Counters one complaint adds to its student and room rows in a given state"""
+    if status not in CLOSED_STATUSES:
+        return {'open_count': 1}
+    counters = {'resolved_count': 1}
+    if resolved_at and created_at:
+        counters[resolution_bucket((resolved_at - created_at).total_seconds() / 3600)] = 1
+    return counters
+
+
+def stats_keys(complaint):
+    """(scope, scope_key) rows a complaint counts towards.
+
+    The room is the one stored on the complaint at filing, so a student
+    moving rooms never shifts counts between rooms.
+    """
+    keys = [('student', str(complaint.student_id))]
+    if complaint.room_number:
+        keys.append(('room', complaint.room_number))
+    return keys
+
+
+class ComplaintStats(db.Model):
+    """Running complaint counters for one student or room in one department.
+
+    Updated in the same transaction as each filing and status change, with
+    atomic upserts, so a ticket page reads a student's and a room's history
+    from a few keyed rows instead of aggregating their complaints.
+    Resolution times are kept as a fixed histogram and the median is
+    interpolated from it. ``rebuild_stats.py`` recomputes the table.
+    """
+    __tablename__ = 'complaint_stats'
+
+    scope = db.Column(db.String(10), primary_key=True)  # student, room
+    scope_key = db.Column(db.String(50), primary_key=True)  # student ID or room number
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), primary_key=True)
+    open_count = db.Column(db.Integer, nullable=False, default=0)
+    resolved_count = db.Column(db.Integer, nullable=False, default=0)
+    resolved_4h = db.Column(db.Integer, nullable=False, default=0)
+    resolved_12h = db.Column(db.Integer, nullable=False, default=0)
+    resolved_1d = db.Column(db.Integer, nullable=False, default=0)
+    resolved_2d = db.Column(db.Integer, nullable=False, default=0)
+    resolved_3d = db.Column(db.Integer, nullable=False, default=0)
+    resolved_1w = db.Column(db.Integer, nullable=False, default=0)
+    resolved_2w = db.Column(db.Integer, nullable=False, default=0)
+    resolved_later = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def apply(deltas):
+        """Add {(scope, scope_key, department_id): {column: delta}} to the table (caller commits).
+
+        Runs without autoflush: pending ORM changes (such as the versioned
+        complaint UPDATE) must flush at the caller's commit, where a
+        StaleDataError is handled, not in the middle of the change.
+        """
+        now = datetime.utcnow()
+        dialect = db.session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+
+        with db.session.no_autoflush:
+            for (scope, scope_key, department_id), counters in deltas.items():
+                counters = {column: value for column, value in counters.items() if value}
+                if not counters:
+                    continue
+                statement = insert(ComplaintStats).values(
+                    scope=scope, scope_key=scope_key, department_id=department_id, updated_at=now, **counters
+                )
+                statement = statement.on_conflict_do_update(
+                    index_elements=['scope', 'scope_key', 'department_id'],
+                    set_=dict({column: getattr(ComplaintStats, column) + statement.excluded[column] for column in counters},
+                              updated_at=now)
+                )
+                db.session.execute(statement)
+
+    @staticmethod
+    def complaints_filed(complaints):
+        """Count new complaints (their filing-time room_number set)"""
+        deltas = {}
+        for complaint in complaints:
+            counters = contribution(complaint.status, complaint.created_at, complaint.resolved_at)
+            for scope, scope_key in stats_keys(complaint):
+                deltas.setdefault((scope, scope_key, complaint.department_id), Counter()).update(counters)
+        ComplaintStats.apply(deltas)
+
+    @staticmethod
+    def complaint_changed(complaint, old_status, old_resolved_at):
+        """Move a complaint's counters after a status change"""
+        old = contribution(old_status, complaint.created_at, old_resolved_at)
+        new = contribution(complaint.status, complaint.created_at, complaint.resolved_at)
+        counters = {column: new.get(column, 0) - old.get(column, 0) for column in set(old) | set(new)}
+        ComplaintStats.apply({
+            (scope, scope_key, complaint.department_id): counters
+            for scope, scope_key in stats_keys(complaint)
+        })
+
+    @staticmethod
+    def history(complaint):
+        """{'student': StatsSummary, 'room': StatsSummary} for a ticket's filer and room (one keyed lookup)"""
+        from models.department import Department
+        keys = stats_keys(complaint)
+        rows = db.session.query(ComplaintStats, Department.name).join(
+            Department, ComplaintStats.department_id == Department.id
+        ).filter(db.or_(*[
+            db.and_(ComplaintStats.scope == scope, ComplaintStats.scope_key == scope_key)
+            for scope, scope_key in keys
+        ])).all()
+
+        return {
+            scope: StatsSummary(scope_key, [(stats, name) for stats, name in rows if stats.scope == scope])
+            for scope, scope_key in keys
+        }
+
+    def __repr__(self):
+        return f'<ComplaintStats {self.scope}:{self.scope_key} dept {self.department_id}>'
+
+
+class StatsSummary:
+    """A student's or room's complaint history, summed over departments"""
+
+    def __init__(self, scope_key, rows):
+        self.scope_key = scope_key
+        self.open_count = sum(stats.open_count for stats, _ in rows)
+        self.resolved_count = sum(stats.resolved_count for stats, _ in rows)
+        self.total = self.open_count + self.resolved_count
+        self.by_department = sorted(
+            ((name, stats.open_count + stats.resolved_count) for stats, name in rows
+             if stats.open_count + stats.resolved_count),
+            key=lambda item: (-item[1], item[0])
+        )
+        self.histogram = [sum(getattr(stats, column) for stats, _ in rows) for _, column in RESOLUTION_BUCKETS]
+
+    @property
+    def median_resolution_hours(self):
+        """Median resolution time interpolated within its histogram bucket, or None.
+
+        In the open-ended last bucket this is the bucket's lower bound.
+        """
+        half = sum(self.histogram) / 2
+        seen, lower = 0, 0
+        for (upper, _), count in zip(RESOLUTION_BUCKETS, self.histogram):
+            if count and seen + count >= half:
+                if upper is None:
+                    return lower
+                return lower + (upper - lower) * (half - seen) / count
+            seen, lower = seen + count, upper
+        return None
+
+    @property
+    def median_resolution_label(self):
+        hours = self.median_resolution_hours
+        if hours is None:
+            return 'No resolved complaints'
+        if hours >= RESOLUTION_BUCKETS[-2][0]:
+            return f'Over {RESOLUTION_BUCKETS[-2][0] // 24} days'
+        if hours < 24:
+            return f'About {max(round(hours), 1)} h'
+        return f'About {hours / 24:.1f} days'
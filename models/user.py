@@ -3,6 +3,7 @@ from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from models import db, login_manager
+from models.campus import current_campus, use_campus
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -24,6 +25,17 @@ class User(UserMixin, db.Model):
     updates = db.relationship('ComplaintUpdate', backref='user', lazy=True)
     department = db.relationship('Department', backref='users')
     
+    __table_args__ = (
+        db.Index('idx_users_created', 'created_at', 'id'),
+        db.Index('idx_users_role_created', 'role', 'created_at', 'id'),
+        db.Index('idx_users_name_lower', db.func.lower(name)),
+        db.Index('idx_users_registration', 'registration_number'),
+    )
+    
+    def get_id(self):
+        """Session ID qualified by campus, since user IDs repeat across campus databases"""
+        return f'{current_campus()}:{self.id}'
+    
     def set_password(self, password):
         """Hash and set password"""
         self.password_hash = generate_password_hash(password)
@@ -49,10 +61,63 @@ class User(UserMixin, db.Model):
     def is_admin(self):
         return self.role == 'admin'
     
+    @staticmethod
+    def search_directory(q=None, role=None, after=None, limit=50):
+        """Page through users newest first, optionally by prefix of email, name or registration number.
+        
+        Returns ``(users, next_cursor)``.
+        """
+        users = User.directory_query(q, role, after).limit(limit + 1).all()
+        next_cursor = users[limit - 1].id if len(users) > limit else None
+        return users[:limit], next_cursor
+    
+    @staticmethod
+    def directory_query(q=None, role=None, after=None):
+        """Users newest first, filtered for the admin directory.
+        
+        Prefix matches are expressed as index range scans, and ``after`` is the
+        ID of the last user on the previous page (keyset pagination).
+        """
+        query = User.query.options(db.joinedload(User.department))
+        
+        if role:
+            query = query.filter(User.role.in_(role) if isinstance(role, (list, tuple)) else User.role == role)
+        
+        q = (q or '').strip()
+        if q:
+            query = query.filter(db.or_(
+                prefix_range(User.email, q.lower()),
+                prefix_range(db.func.lower(User.name), q.lower()),
+                prefix_range(User.registration_number, q)
+            ))
+        
+        if after:
+            cursor = db.session.query(User.created_at, User.id).filter_by(id=int(after)).first()
+            if cursor:
+                query = query.filter(db.tuple_(User.created_at, User.id) < tuple(cursor))
+        
+        return query.order_by(User.created_at.desc(), User.id.desc())
+    
+    @staticmethod
+    def count_by_role():
+        """User counts per role from a single grouped query"""
+        return dict(db.session.query(User.role, db.func.count(User.id)).group_by(User.role).all())
+    
     def __repr__(self):
         return f'<User {self.email}>'
 
+def prefix_range(column, prefix):
+    """``column LIKE 'prefix%'`` written as a range so it can use a plain (or expression) index"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return db.and_(column >= prefix, column < upper)
+
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user by ID for Flask-Login"""
+    """Load user by ID for Flask-Login, pinning the request to the user's campus"""
+    campus, _, user_id = user_id.rpartition(':')
+    if campus:
+        try:
+            use_campus(campus)
+        except KeyError:
+            return None
     return User.query.get(int(user_id))
@@ -0,0 +1,48 @@
+"""Notification worker - drains the email outbox in batches"""
+import argparse
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models.campus import campus_context
+from services.notifications import drain_outbox, get_transport
+
+def drain_campuses(app, transport):
+    """Drain every campus's outbox once; returns the number of events handled"""
+    handled = 0
+    for campus in app.config['CAMPUSES']:
+        with campus_context(app, campus):
+            handled += drain_outbox(transport)
+    return handled
+
+def run_worker(once=False):
+    """Deliver pending notifications until interrupted"""
+    app = create_app(web=False)
+    transport = get_transport(app.config)
+    interval = app.config['NOTIFICATION_POLL_INTERVAL']
+    print(f"📧 Notification worker started ({app.config['MAIL_TRANSPORT']} transport, "
+          f"{len(app.config['CAMPUSES'])} campus(es))")
+
+    while True:
+        handled = drain_campuses(app, transport)
+        if handled:
+            print(f"✅ Processed {handled} notification(s)")
+            # Keep draining while there is a backlog
+            continue
+        if once:
+            break
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--once', action='store_true', help='drain the outbox and exit')
+    args = parser.parse_args()
+
+    try:
+        run_worker(once=args.once)
+    except KeyboardInterrupt:
+        print("👋 Notification worker stopped")
@@ -0,0 +1,32 @@
+"""Stats maintenance - rebuilds per-student and per-room complaint statistics from scratch"""
+import argparse
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models.campus import campus_context
+from services.stats import rebuild_stats
+
+def run_rebuild(campuses=None):
+    """Rebuild the stats table of each campus (all campuses by default)"""
+    app = create_app(web=False)
+    
+    for campus in campuses or app.config['CAMPUSES']:
+        if campus not in app.config['CAMPUSES']:
+            print(f"❌ Unknown campus: {campus}")
+            continue
+        with campus_context(app, campus):
+            started = time.perf_counter()
+            complaints, rows = rebuild_stats()
+            elapsed = time.perf_counter() - started
+            print(f"✅ {campus}: {rows} stats rows from {complaints} complaints in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--campus', action='append', help='campus to rebuild (repeatable; default: all)')
+    args = parser.parse_args()
+    run_rebuild(args.campus)
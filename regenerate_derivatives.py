@@ -0,0 +1,36 @@
+"""Media maintenance - regenerates attachment derivatives whose background job never finished"""
+import argparse
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models.campus import campus_context
+from services.media import stale_attachment_ids, process_attachment
+
+def run_regenerate(campuses=None, stale_minutes=None, include_failed=False):
+    """Process stale pending (and optionally failed) attachments of each campus (all by default)"""
+    app = create_app(web=False)
+    stale_minutes = app.config['MEDIA_STALE_MINUTES'] if stale_minutes is None else stale_minutes
+    statuses = ('pending', 'failed') if include_failed else ('pending',)
+
+    for campus in campuses or app.config['CAMPUSES']:
+        if campus not in app.config['CAMPUSES']:
+            print(f"❌ Unknown campus: {campus}")
+            continue
+        with campus_context(app, campus):
+            attachment_ids = stale_attachment_ids(stale_minutes, statuses)
+
+        for attachment_id in attachment_ids:
+            process_attachment(app, campus, attachment_id)
+        print(f"✅ {campus}: processed {len(attachment_ids)} attachment(s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--campus', action='append', help='campus to process (repeatable; default: all)')
+    parser.add_argument('--stale-minutes', type=int, help='minimum age of a pending attachment (default: MEDIA_STALE_MINUTES)')
+    parser.add_argument('--failed', action='store_true', help='also retry attachments whose last job failed')
+    args = parser.parse_args()
+    run_regenerate(args.campus, args.stale_minutes, args.failed)
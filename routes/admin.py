@@ -1,15 +1,30 @@
 """Admin routes"""
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_required, current_user
 from models import db
+from models.campus import current_campus
 from models.user import User
 from models.complaint import Complaint
+from models.projections import ComplaintRow
 from models.department import Department
+from models.stats import ComplaintStats
+from routes.utils import wants_json, timeline_response, stream_page, StreamedPage
+from services.campuses import fan_out, campus_summary, merge_summaries
 from sqlalchemy import func
 from datetime import datetime, timedelta
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+# Ready-made questions for the analytics page
+ANALYTICS_PRESETS = {
+    'block_week': {'title': 'Complaints per room block per week', 'group_by': ['block', 'week'], 'measure': 'count'},
+    'resolution': {'title': 'Resolution time by department, priority and month',
+                   'group_by': ['department', 'priority', 'month'], 'measure': 'resolution_hours'},
+    'repeat_rooms': {'title': 'Rooms with repeat complaints', 'group_by': ['room'], 'measure': 'count', 'min_count': 3},
+    'first_response': {'title': 'First response time by department', 'group_by': ['department'],
+                       'measure': 'first_response_hours'}
+}
+
 @admin_bp.before_request
 def check_admin():
     """Ensure only admins can access these routes"""
@@ -28,17 +43,17 @@ def dashboard():
     status_filter = request.args.get('status', 'all')
     department_filter = request.args.get('department', 'all')
     
-    # Base query
-    query = Complaint.query
+    # Base query (summary columns only)
+    query = ComplaintRow.query()
     
     # Apply filters
     if status_filter != 'all':
-        query = query.filter_by(status=status_filter)
+        query = query.filter(Complaint.status == status_filter)
     if department_filter != 'all':
-        query = query.filter_by(department_id=int(department_filter))
+        query = query.filter(Complaint.department_id == int(department_filter))
     
     # Get complaints
-    complaints = query.order_by(Complaint.created_at.desc()).limit(50).all()
+    complaints = list(ComplaintRow.iterate(query.order_by(Complaint.created_at.desc()).limit(50)))
     
     # Overall statistics
     total_complaints = Complaint.query.count()
@@ -56,10 +71,10 @@ def dashboard():
     
     # Get long-pending complaints (pending for more than 7 days)
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    long_pending = Complaint.query.filter(
+    long_pending = list(ComplaintRow.iterate(ComplaintRow.query().filter(
         Complaint.status == 'Pending',
         Complaint.created_at < seven_days_ago
-    ).order_by(Complaint.created_at).all()
+    ).order_by(Complaint.created_at)))
     
     departments = Department.get_all()
     
@@ -79,26 +94,45 @@ def dashboard():
 def view_complaint(ticket_id):
     """View complaint details"""
     complaint = Complaint.query.filter_by(ticket_id=ticket_id).first_or_404()
-    return render_template('admin/view_complaint.html', complaint=complaint)
+    updates, has_more_updates = complaint.get_timeline()
+    return render_template('admin/view_complaint.html',
+                         complaint=complaint,
+                         updates=updates,
+                         has_more_updates=has_more_updates,
+                         history=ComplaintStats.history(complaint))
+
+@admin_bp.route('/complaint/<ticket_id>/updates')
+def complaint_updates(ticket_id):
+    """Get timeline entries older or newer than a cursor"""
+    complaint = Complaint.query.filter_by(ticket_id=ticket_id).first_or_404()
+    return timeline_response(complaint, 'admin/_update.html',
+                             before=request.args.get('before', type=int),
+                             after=request.args.get('after', type=int))
 
 @admin_bp.route('/users')
 def users():
     """Manage users"""
     role_filter = request.args.get('role', 'all')
+    search = request.args.get('q', '').strip()
+    after = request.args.get('after', type=int)
     
-    query = User.query
-    if role_filter != 'all':
-        query = query.filter_by(role=role_filter)
-    
-    users = query.order_by(User.created_at.desc()).all()
+    # Rows are fetched in batches while the table streams out
+    users = StreamedPage(
+        User.directory_query(q=search, role=None if role_filter == 'all' else role_filter, after=after),
+        limit=current_app.config['USER_DIRECTORY_PAGE_SIZE'],
+        batch_size=current_app.config['STREAM_BATCH_SIZE']
+    )
     
     # Statistics
-    total_users = User.query.count()
-    students = User.query.filter_by(role='student').count()
-    department_users = User.query.filter(User.role.in_(['department', 'warden'])).count()
+    role_counts = User.count_by_role()
+    total_users = sum(role_counts.values())
+    students = role_counts.get('student', 0)
+    department_users = role_counts.get('department', 0) + role_counts.get('warden', 0)
     
-    return render_template('admin/users.html',
+    return stream_page('admin/users.html',
                          users=users,
+                         is_first_page=after is None,
+                         search=search,
                          total_users=total_users,
                          students=students,
                          department_users=department_users,
@@ -199,3 +233,61 @@ def reports():
                          recent_completed=recent_completed,
                          avg_resolution_hours=avg_resolution_hours,
                          priority_stats=priority_stats)
+
+@admin_bp.route('/analytics')
+def analytics():
+    """Slice-and-dice reports answered from the columnar snapshot"""
+    # Loads numpy, so it is imported on first use rather than at startup
+    from services.analytics import DIMENSIONS, MEASURES, load_snapshot, snapshot_directory
+    
+    snapshot = load_snapshot(snapshot_directory(current_app.config, current_campus()))
+    
+    preset = ANALYTICS_PRESETS.get(request.args.get('preset', 'block_week'), {})
+    group_by = [d for d in request.args.getlist('group_by') if d in DIMENSIONS][:3] or preset.get('group_by', [])
+    measure = request.args.get('measure', preset.get('measure', 'count'))
+    if measure not in MEASURES:
+        measure = 'count'
+    min_count = request.args.get('min_count', preset.get('min_count', 1), type=int)
+    filters = {d: [v for v in request.args.getlist(d) if v] for d in DIMENSIONS}
+    filters = {d: values for d, values in filters.items() if values}
+    
+    results = []
+    if snapshot:
+        results = snapshot.aggregate(group_by, measure, filters, min_count)
+        if measure == 'count' and preset.get('min_count'):
+            results.sort(key=lambda row: row[1], reverse=True)
+    
+    if wants_json() or request.args.get('format') == 'json':
+        return jsonify({
+            'built_at': snapshot.built_at.isoformat() if snapshot else None,
+            'group_by': group_by,
+            'measure': measure,
+            'rows': [{'key': list(key), 'count': count, 'value': value} for key, count, value in results]
+        })
+    
+    return render_template('admin/analytics.html',
+                         snapshot=snapshot,
+                         presets=ANALYTICS_PRESETS,
+                         dimensions=DIMENSIONS,
+                         measures=MEASURES,
+                         group_by=group_by,
+                         measure=measure,
+                         min_count=min_count,
+                         filters=filters,
+                         results=results)
+
+@admin_bp.route('/campuses')
+def campuses():
+    """Cross-campus rollup, queried from every campus database in parallel"""
+    app = current_app._get_current_object()
+    summaries, errors = fan_out(app, campus_summary, app.config['CAMPUS_ROLLUP_TIMEOUT'])
+    total = merge_summaries(summaries.values())
+    
+    if wants_json():
+        return jsonify({'campuses': summaries, 'errors': errors, 'total': total})
+    
+    return render_template('admin/campuses.html',
+                         campuses=app.config['CAMPUSES'],
+                         summaries=summaries,
+                         errors=errors,
+                         total=total)
@@ -0,0 +1,237 @@
+"""Async handlers for the ASGI serving mode (see asgi.py).
+
+Only I/O-bound endpoints live here: the change-data feed (event reads, acks
+and the long-lived event stream) and attachment upload and download. They
+answer at the same URLs, with the same auth and payloads, as their sync
+twins in routes/feed.py, routes/student.py and the static folder, so a
+client can't tell which server mode it is talking to. A slow stream or
+upload waits on a coroutine instead of holding one of the WSGI threads.
+Everything else falls through to the Flask app.
+"""
+import asyncio
+import os
+import time
+import anyio
+from itsdangerous import BadSignature
+from sqlalchemy import select
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from werkzeug.utils import secure_filename
+from models.campus import campus_context
+from models.complaint import Complaint
+from models.feed import ComplaintEvent, FeedConsumer
+from models.user import User
+from services.media import queue_derivatives
+from services.uploads import allowed_file, upload_destination, build_attachment
+
+
+def async_routes(flask_app):
+    """Routes the ASGI app serves itself, ahead of the mounted Flask app"""
+    return [
+        Route('/api/feed/events', feed_events, methods=['GET']),
+        Route('/api/feed/stream', feed_stream, methods=['GET']),
+        Route('/api/feed/ack', feed_ack, methods=['POST']),
+        Route('/student/complaint/{ticket_id}/attachments/{filename}', upload_attachment, methods=['PUT']),
+        Mount('/static/uploads', app=StaticFiles(directory=flask_app.config['UPLOAD_FOLDER'], check_dir=False))
+    ]
+
+
+def int_param(request, name, default):
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def unauthorized():
+    return JSONResponse({'error': 'A valid feed token is required.'}, status_code=401)
+
+
+def bearer_token(request):
+    auth = request.headers.get('authorization', '')
+    return auth[len('Bearer '):].strip() if auth.startswith('Bearer ') else ''
+
+
+def token_campus(request):
+    """Campus named by the bearer token (``<campus>.<secret>``), or None if it isn't one of ours"""
+    campus = bearer_token(request).split('.', 1)[0]
+    return campus if campus in request.app.state.flask_app.config['CAMPUSES'] else None
+
+
+async def feed_consumer(request, session):
+    return await session.scalar(FeedConsumer.token_statement(bearer_token(request)))
+
+
+async def read_events(session, after, limit, settle_seconds):
+    events = (await session.scalars(ComplaintEvent.after_statement(after, limit, settle_seconds))).all()
+    return events[:limit], len(events) > limit
+
+
+async def feed_events(request):
+    """Async twin of routes.feed.events"""
+    config = request.app.state.flask_app.config
+    request.state.campus = token_campus(request)
+    if request.state.campus is None:
+        return unauthorized()
+
+    async with request.app.state.database.session(request.state.campus) as session:
+        consumer = await feed_consumer(request, session)
+        if consumer is None:
+            return unauthorized()
+
+        after = int_param(request, 'after', consumer.acked_sequence)
+        limit = min(int_param(request, 'limit', config['FEED_PAGE_SIZE']), config['FEED_MAX_PAGE_SIZE'])
+        events, has_more = await read_events(session, after, max(limit, 1), config['FEED_SETTLE_SECONDS'])
+
+    return JSONResponse({
+        'events': [event.to_dict() for event in events],
+        'next_cursor': events[-1].id if events else after,
+        'has_more': has_more
+    })
+
+
+async def feed_ack(request):
+    """Async twin of routes.feed.ack"""
+    request.state.campus = token_campus(request)
+    if request.state.campus is None:
+        return unauthorized()
+
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    sequence = data.get('sequence') if isinstance(data, dict) else None
+
+    async with request.app.state.database.session(request.state.campus) as session:
+        consumer = await feed_consumer(request, session)
+        if consumer is None:
+            return unauthorized()
+        if not isinstance(sequence, int) or sequence < 0:
+            return JSONResponse({'error': 'Request body must contain an integer "sequence".'}, status_code=400)
+        newest = await session.scalar(ComplaintEvent.newest_sequence_statement())
+        if sequence > newest:
+            return JSONResponse({'error': f'Sequence {sequence} is past the newest event ({newest}).'},
+                                status_code=400)
+
+        consumer.ack(sequence)
+        await session.commit()
+        return JSONResponse({'consumer': consumer.name, 'acked_sequence': consumer.acked_sequence})
+
+
+async def feed_stream(request):
+    """Async twin of routes.feed.stream; an open stream costs a coroutine, not a thread"""
+    request.state.campus = token_campus(request)
+    if request.state.campus is None:
+        return unauthorized()
+
+    async with request.app.state.database.session(request.state.campus) as session:
+        consumer = await feed_consumer(request, session)
+        if consumer is None:
+            return unauthorized()
+        after = int_param(request, 'after', consumer.acked_sequence)
+
+    return StreamingResponse(follow_events(request, after),
+                             media_type='application/x-ndjson',
+                             headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+
+async def follow_events(request, after):
+    """Same polling loop as routes.feed.follow_events, with a fresh session per poll"""
+    config = request.app.state.flask_app.config
+    database = request.app.state.database
+    deadline = time.monotonic() + config['FEED_STREAM_SECONDS']
+    idle = 0
+
+    while time.monotonic() < deadline:
+        async with database.session(request.state.campus) as session:
+            events, has_more = await read_events(session, after, config['FEED_PAGE_SIZE'], config['FEED_SETTLE_SECONDS'])
+
+        if events:
+            after, idle = events[-1].id, 0
+            yield ''.join(event.to_json() + '\n' for event in events)
+            if has_more:
+                continue
+        elif idle >= config['FEED_STREAM_HEARTBEAT']:
+            idle = 0
+            yield '\n'
+
+        await asyncio.sleep(config['FEED_STREAM_POLL_INTERVAL'])
+        idle += config['FEED_STREAM_POLL_INTERVAL']
+
+
+def session_user_key(request, flask_app):
+    """(campus, user id) from the Flask-Login session cookie, or None"""
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if not cookie:
+        return None
+
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    try:
+        data = serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return None
+
+    campus, _, user_id = str(data.get('_user_id') or '').rpartition(':')
+    if campus not in flask_app.config['CAMPUSES'] or not user_id.isdigit():
+        return None
+    return campus, int(user_id)
+
+
+async def upload_attachment(request):
+    """Async twin of routes.student.upload_attachment; the body is streamed to disk as it arrives.
+
+    API clients get JSON errors here (401 instead of the login redirect).
+    """
+    flask_app = request.app.state.flask_app
+    config = flask_app.config
+
+    key = session_user_key(request, flask_app)
+    if key is None:
+        return JSONResponse({'error': 'Please login to continue.'}, status_code=401)
+    campus, user_id = key
+
+    filename = secure_filename(request.path_params['filename'])
+    if not allowed_file(filename, config['ALLOWED_EXTENSIONS']):
+        return JSONResponse({'error': 'File type not allowed.'}, status_code=400)
+    if int(request.headers.get('content-length') or 0) > config['MAX_CONTENT_LENGTH']:
+        return JSONResponse({'error': 'File is too large.'}, status_code=413)
+
+    # Look up and release the connection before the body arrives; a slow upload must not hold a pool slot
+    async with request.app.state.database.session(campus) as session:
+        user = await session.get(User, user_id)
+        if user is None or not user.is_active or not user.is_student:
+            return JSONResponse({'error': 'Access denied. Students only.'}, status_code=403)
+
+        complaint = await session.scalar(select(Complaint).where(
+            Complaint.ticket_id == request.path_params['ticket_id'],
+            Complaint.student_id == user.id
+        ))
+        if complaint is None:
+            return JSONResponse({'error': 'Complaint not found.'}, status_code=404)
+
+    filepath, stored_path = upload_destination(config['UPLOAD_FOLDER'], campus, complaint.ticket_id, filename)
+    size = 0
+    try:
+        async with await anyio.open_file(filepath, 'wb') as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > config['MAX_CONTENT_LENGTH']:
+                    raise ValueError('upload exceeds MAX_CONTENT_LENGTH')
+                await f.write(chunk)
+    except ValueError:
+        os.remove(filepath)
+        return JSONResponse({'error': 'File is too large.'}, status_code=413)
+    except BaseException:
+        os.remove(filepath)
+        raise
+
+    async with request.app.state.database.session(campus) as session:
+        attachment = build_attachment(complaint.id, filename, stored_path, size)
+        session.add(attachment)
+        await session.commit()
+
+    with campus_context(flask_app, campus):
+        queue_derivatives(flask_app, [attachment.id])
+    return JSONResponse({'id': attachment.id, 'file_name': attachment.file_name, 'file_size': attachment.file_size},
+                        status_code=201)
@@ -1,12 +1,16 @@
 """Authentication routes"""
-from flask import Blueprint, render_template, redirect, url_for, flash, request, session
+from flask import Blueprint, render_template, redirect, url_for, flash, request, session, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from models import db
+from models.campus import campus_for_email, use_campus
 from models.user import User
-from config import Config
 
 auth_bp = Blueprint('auth', __name__)
 
+def university_domains():
+    """Email domains of all campuses, for error messages"""
+    return ' or '.join(campus['domain'] for campus in current_app.config['CAMPUSES'].values())
+
 @auth_bp.route('/')
 def index():
     """Landing page - redirect based on login status"""
@@ -34,6 +38,10 @@ def login():
             flash('Please provide both email and password.', 'danger')
             return render_template('login.html')
         
+        # Each campus has its own database, chosen by the email domain
+        campus = campus_for_email(email)
+        use_campus(campus or current_app.config['DEFAULT_CAMPUS'])
+        
         # Find user
         user = User.query.filter_by(email=email).first()
         
@@ -50,8 +58,8 @@ def login():
             return render_template('login.html')
         
         # For students, verify university email
-        if user.is_student and not email.endswith(f'@{Config.UNIVERSITY_EMAIL_DOMAIN}'):
-            flash(f'Students must use their {Config.UNIVERSITY_EMAIL_DOMAIN} email address.', 'danger')
+        if user.is_student and campus is None:
+            flash(f'Students must use their {university_domains()} email address.', 'danger')
             return render_template('login.html')
         
         # Login successful
@@ -93,9 +101,11 @@ def register():
             flash('All fields are required.', 'danger')
             return render_template('register.html')
         
-        if not email.endswith(f'@{Config.UNIVERSITY_EMAIL_DOMAIN}'):
-            flash(f'Please use your university email ({Config.UNIVERSITY_EMAIL_DOMAIN}).', 'danger')
+        campus = campus_for_email(email)
+        if campus is None:
+            flash(f'Please use your university email ({university_domains()}).', 'danger')
             return render_template('register.html')
+        use_campus(campus)
         
         if password != confirm_password:
             flash('Passwords do not match.', 'danger')
@@ -1,9 +1,17 @@
 """Department/Warden routes"""
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_required, current_user
 from models import db
-from models.complaint import Complaint, ComplaintUpdate
+from models.complaint import Complaint, ComplaintUpdate, ComplaintRead
+from models.projections import ComplaintRow
 from models.user import User
+from models.feed import ComplaintEvent
+from models.notification import NotificationOutbox
+from models.stats import ComplaintStats
+from models.cluster import ComplaintCluster
+from sqlalchemy.orm.exc import StaleDataError
+from routes.utils import wants_json, timeline_response, stream_page
+from collections import OrderedDict
 from datetime import datetime, date
 
 department_bp = Blueprint('department', __name__, url_prefix='/department')
@@ -25,18 +33,21 @@ def dashboard():
     # Get filter parameters
     status_filter = request.args.get('status', 'all')
     priority_filter = request.args.get('priority', 'all')
+    sort = request.args.get('sort', 'activity')
     
-    # Base query - only complaints for this department
-    query = Complaint.query.filter_by(department_id=current_user.department_id)
+    # Base query - only complaints for this department, with this user's read marker
+    query = ComplaintRow.query(reader_id=current_user.id).filter(Complaint.department_id == current_user.department_id)
     
     # Apply filters
     if status_filter != 'all':
-        query = query.filter_by(status=status_filter)
+        query = query.filter(Complaint.status == status_filter)
     if priority_filter != 'all':
-        query = query.filter_by(priority=priority_filter)
+        query = query.filter(Complaint.priority == priority_filter)
     
-    # Get complaints ordered by newest first
-    complaints = query.order_by(Complaint.created_at.desc()).all()
+    # Most recent activity first, or newest first; rows are fetched in batches as the table streams
+    order = Complaint.last_update_at if sort == 'activity' else Complaint.created_at
+    complaints = ComplaintRow.iterate(query.order_by(order.desc(), Complaint.id.desc()),
+                                      current_app.config['STREAM_BATCH_SIZE'])
     
     # Get statistics
     total_complaints = Complaint.query.filter_by(department_id=current_user.department_id).count()
@@ -44,8 +55,9 @@ def dashboard():
     in_progress = Complaint.query.filter_by(department_id=current_user.department_id, status='In Progress').count()
     completed = Complaint.query.filter_by(department_id=current_user.department_id, status='Completed').count()
     
-    return render_template('department/dashboard.html',
+    return stream_page('department/dashboard.html',
                          complaints=complaints,
+                         sort=sort,
                          total_complaints=total_complaints,
                          pending=pending,
                          in_progress=in_progress,
@@ -53,6 +65,54 @@ def dashboard():
                          status_filter=status_filter,
                          priority_filter=priority_filter)
 
+@department_bp.route('/clusters')
+def clusters():
+    """Clustered view - groups of near-duplicate open complaints"""
+    open_complaints = Complaint.query.join(
+        ComplaintCluster, Complaint.cluster_id == ComplaintCluster.id
+    ).filter(
+        ComplaintCluster.department_id == current_user.department_id,
+        ComplaintCluster.size > 1,
+        Complaint.status.notin_(['Completed', 'Closed'])
+    ).order_by(ComplaintCluster.last_seen_at.desc(), Complaint.created_at).all()
+    
+    # Group by cluster, keeping only clusters that still have repeats to triage
+    grouped = OrderedDict()
+    for complaint in open_complaints:
+        grouped.setdefault(complaint.cluster, []).append(complaint)
+    clusters = [(cluster, members) for cluster, members in grouped.items() if len(members) > 1]
+    
+    return render_template('department/clusters.html', clusters=clusters)
+
+@department_bp.route('/cluster/<int:cluster_id>/update-status', methods=['POST'])
+def update_cluster_status(cluster_id):
+    """Update the status of every open complaint in a cluster"""
+    cluster = ComplaintCluster.query.filter_by(
+        id=cluster_id,
+        department_id=current_user.department_id
+    ).first_or_404()
+    
+    new_status = request.form.get('status')
+    message = request.form.get('message', '').strip()
+    
+    if new_status not in ['Pending', 'In Progress', 'Completed']:
+        flash('Please select a status.', 'danger')
+        return redirect(url_for('department.clusters'))
+    
+    complaints = cluster.get_open_complaints()
+    status_message = message or f'Status updated to {new_status}'
+    try:
+        for complaint in complaints:
+            complaint.update_status(new_status, current_user.id, status_message, commit=False)
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        flash('Some complaints in this group were changed by someone else. Please review and try again.', 'warning')
+        return redirect(url_for('department.clusters'))
+    
+    flash(f'{len(complaints)} complaints updated to {new_status}.', 'success')
+    return redirect(url_for('department.clusters'))
+
 @department_bp.route('/complaint/<ticket_id>')
 def view_complaint(ticket_id):
     """View complaint details"""
@@ -61,7 +121,60 @@ def view_complaint(ticket_id):
         department_id=current_user.department_id
     ).first_or_404()
     
-    return render_template('department/view_complaint.html', complaint=complaint)
+    updates, has_more_updates = complaint.get_timeline()
+    ComplaintRead.mark_read(current_user.id, complaint.id)
+    return render_template('department/view_complaint.html',
+                         complaint=complaint,
+                         updates=updates,
+                         has_more_updates=has_more_updates,
+                         history=ComplaintStats.history(complaint))
+
+@department_bp.route('/queue/next', methods=['POST'])
+def next_ticket():
+    """Claim the most urgent open complaint in the department"""
+    complaint = Complaint.claim_next(current_user.department_id, current_user.id)
+    
+    if wants_json():
+        if complaint is None:
+            return jsonify({'complaint': None})
+        return jsonify({
+            'ticket_id': complaint.ticket_id,
+            'claim_expires_at': complaint.claim_expires_at.isoformat(),
+            'url': url_for('department.view_complaint', ticket_id=complaint.ticket_id)
+        })
+    
+    if complaint is None:
+        flash('No open complaints are waiting in the queue.', 'info')
+        return redirect(url_for('department.dashboard'))
+    
+    flash(f'Ticket {complaint.ticket_id} is yours until {complaint.claim_expires_at.strftime("%H:%M")} UTC.', 'success')
+    return redirect(url_for('department.view_complaint', ticket_id=complaint.ticket_id))
+
+@department_bp.route('/complaint/<ticket_id>/release', methods=['POST'])
+def release_claim(ticket_id):
+    """Put a claimed complaint back in the queue"""
+    complaint = Complaint.query.filter_by(
+        ticket_id=ticket_id,
+        department_id=current_user.department_id
+    ).first_or_404()
+    
+    if complaint.release_claim(current_user.id):
+        flash(f'Ticket {ticket_id} is back in the queue.', 'success')
+    else:
+        flash('You do not hold a claim on this complaint.', 'warning')
+    return redirect(url_for('department.dashboard'))
+
+@department_bp.route('/complaint/<ticket_id>/updates')
+def complaint_updates(ticket_id):
+    """Get timeline entries older or newer than a cursor"""
+    complaint = Complaint.query.filter_by(
+        ticket_id=ticket_id,
+        department_id=current_user.department_id
+    ).first_or_404()
+    
+    return timeline_response(complaint, 'department/_update.html',
+                             before=request.args.get('before', type=int),
+                             after=request.args.get('after', type=int))
 
 @department_bp.route('/complaint/<ticket_id>/reply', methods=['POST'])
 def reply_complaint(ticket_id):
@@ -73,6 +186,8 @@ def reply_complaint(ticket_id):
     
     message = request.form.get('message', '').strip()
     if not message:
+        if wants_json():
+            return jsonify({'error': 'Please enter a message.'}), 400
         flash('Please enter a message.', 'danger')
         return redirect(url_for('department.view_complaint', ticket_id=ticket_id))
     
@@ -84,20 +199,84 @@ def reply_complaint(ticket_id):
         update_type='reply'
     )
     db.session.add(update)
-    complaint.updated_at = datetime.utcnow()
+    complaint.touch()
+    NotificationOutbox.complaint_updated(complaint, current_user, message)
+    ComplaintEvent.record(complaint, 'reply', current_user.id, role=current_user.role, message=message)
+    ComplaintRead.mark_read(current_user.id, complaint.id, commit=False)
     db.session.commit()
     
+    # Return only the entries the client hasn't seen yet
+    if wants_json():
+        return timeline_response(complaint, 'department/_update.html',
+                                 after=request.form.get('after', type=int))
+    
     flash('Reply sent successfully.', 'success')
     return redirect(url_for('department.view_complaint', ticket_id=ticket_id))
 
+def apply_state_change(ticket_id, changes, apply):
+    """Apply a state change to a complaint under optimistic concurrency control.
+    
+    The form carries the version and field values the user was shown. Changes
+    that don't touch anything modified since then are merged onto the current
+    row; otherwise a 409 conflict page is returned. If another request commits
+    between our read and write, the version check fails and we retry once on
+    fresh data. Returns None on success or a conflict response.
+    """
+    seen_version = request.form.get('version', type=int)
+    seen = {field: request.form[f'seen_{field}'] for field in changes if f'seen_{field}' in request.form}
+    
+    for attempt in range(2):
+        complaint = Complaint.query.filter_by(
+            ticket_id=ticket_id,
+            department_id=current_user.department_id
+        ).first_or_404()
+        
+        conflicts = complaint.find_conflicts(seen_version, seen, changes)
+        if conflicts:
+            return conflict_response(complaint, conflicts)
+        
+        try:
+            apply(complaint)
+            db.session.commit()
+            return None
+        except StaleDataError:
+            db.session.rollback()
+    
+    return conflict_response(complaint, list(changes))
+
+def conflict_response(complaint, fields):
+    """Tell the user their change clashes with edits made since they loaded the page"""
+    # Newest first, one timeline page at most; without a seen_update_id that is just the latest page
+    changes = complaint.updates.options(db.joinedload(ComplaintUpdate.user))
+    seen_update_id = request.form.get('seen_update_id', type=int)
+    if seen_update_id is not None:
+        changes = changes.filter(ComplaintUpdate.id > seen_update_id)
+    changes = changes.limit(current_app.config['TIMELINE_PAGE_SIZE']).all()
+    
+    if wants_json():
+        return jsonify({
+            'error': 'conflict',
+            'fields': fields,
+            'version': complaint.version,
+            'current': {field: str(getattr(complaint, field) or '') for field in fields},
+            'changes': [
+                {'id': u.id, 'user': u.user.name, 'message': u.message, 'created_at': u.created_at.isoformat()}
+                for u in changes
+            ]
+        }), 409
+    
+    updates, has_more_updates = complaint.get_timeline()
+    ComplaintRead.mark_read(current_user.id, complaint.id)
+    return render_template('department/view_complaint.html',
+                         complaint=complaint,
+                         updates=updates,
+                         has_more_updates=has_more_updates,
+                         history=ComplaintStats.history(complaint),
+                         conflict={'fields': fields, 'changes': changes}), 409
+
 @department_bp.route('/complaint/<ticket_id>/update-status', methods=['POST'])
 def update_status(ticket_id):
     """Update complaint status"""
-    complaint = Complaint.query.filter_by(
-        ticket_id=ticket_id,
-        department_id=current_user.department_id
-    ).first_or_404()
-    
     new_status = request.form.get('status')
     message = request.form.get('message', '').strip()
     expected_date = request.form.get('expected_resolution_date')
@@ -106,16 +285,24 @@ def update_status(ticket_id):
         flash('Please select a status.', 'danger')
         return redirect(url_for('department.view_complaint', ticket_id=ticket_id))
     
+    changes = {'status': new_status}
+    
     # Update expected resolution date if provided
     if expected_date:
         try:
-            complaint.expected_resolution_date = datetime.strptime(expected_date, '%Y-%m-%d').date()
+            changes['expected_resolution_date'] = datetime.strptime(expected_date, '%Y-%m-%d').date()
         except ValueError:
             pass
     
-    # Update status
-    status_message = message or f'Status updated to {new_status}'
-    complaint.update_status(new_status, current_user.id, status_message)
+    def apply(complaint):
+        if 'expected_resolution_date' in changes:
+            complaint.expected_resolution_date = changes['expected_resolution_date']
+        status_message = message or f'Status updated to {new_status}'
+        complaint.update_status(new_status, current_user.id, status_message, commit=False)
+    
+    conflict = apply_state_change(ticket_id, changes, apply)
+    if conflict:
+        return conflict
     
     flash(f'Status updated to {new_status} successfully.', 'success')
     return redirect(url_for('department.view_complaint', ticket_id=ticket_id))
@@ -123,16 +310,15 @@ def update_status(ticket_id):
 @department_bp.route('/complaint/<ticket_id>/set-priority', methods=['POST'])
 def set_priority(ticket_id):
     """Set complaint priority"""
-    complaint = Complaint.query.filter_by(
-        ticket_id=ticket_id,
-        department_id=current_user.department_id
-    ).first_or_404()
-    
     priority = request.form.get('priority')
-    if priority in ['Low', 'Medium', 'High', 'Urgent']:
+    if priority not in ['Low', 'Medium', 'High', 'Urgent']:
+        flash('Invalid priority level.', 'danger')
+        return redirect(url_for('department.view_complaint', ticket_id=ticket_id))
+    
+    def apply(complaint):
         old_priority = complaint.priority
         complaint.priority = priority
-        complaint.updated_at = datetime.utcnow()
+        complaint.record_update('status_change')
         
         # Create update record
         update = ComplaintUpdate(
@@ -142,10 +328,11 @@ def set_priority(ticket_id):
             update_type='status_change'
         )
         db.session.add(update)
-        db.session.commit()
-        
-        flash(f'Priority updated to {priority}.', 'success')
-    else:
-        flash('Invalid priority level.', 'danger')
+        ComplaintEvent.record(complaint, 'priority_change', current_user.id, old=old_priority, new=priority)
+    
+    conflict = apply_state_change(ticket_id, {'priority': priority}, apply)
+    if conflict:
+        return conflict
     
+    flash(f'Priority updated to {priority}.', 'success')
     return redirect(url_for('department.view_complaint', ticket_id=ticket_id))
@@ -0,0 +1,97 @@
+"""Change-data feed API for external consumers (facilities system, BI tools)"""
+import time
+from flask import Blueprint, Response, jsonify, request, current_app, g, stream_with_context
+from models import db
+from models.campus import use_campus
+from models.feed import ComplaintEvent, FeedConsumer
+
+feed_bp = Blueprint('feed', __name__, url_prefix='/api/feed')
+
+@feed_bp.before_request
+def check_feed_consumer():
+    """Authenticate the consumer by its bearer token (``<campus>.<secret>``)"""
+    auth = request.headers.get('Authorization', '')
+    token = auth[len('Bearer '):].strip() if auth.startswith('Bearer ') else ''
+    campus = token.split('.', 1)[0]
+
+    if campus not in current_app.config['CAMPUSES']:
+        return jsonify({'error': 'A valid feed token is required.'}), 401
+
+    use_campus(campus)
+    g.feed_consumer = FeedConsumer.from_token(token)
+    if g.feed_consumer is None:
+        return jsonify({'error': 'A valid feed token is required.'}), 401
+
+@feed_bp.route('/events')
+def events():
+    """Events after a sequence number, oldest first.
+
+    ``after`` defaults to the consumer's last acknowledged sequence, so a
+    consumer that restarts simply resumes. Pass the returned ``next_cursor``
+    as ``after`` to read the next page.
+    """
+    after = request.args.get('after', g.feed_consumer.acked_sequence, type=int)
+    limit = min(request.args.get('limit', current_app.config['FEED_PAGE_SIZE'], type=int),
+                current_app.config['FEED_MAX_PAGE_SIZE'])
+
+    events, has_more = ComplaintEvent.read_after(after, max(limit, 1), current_app.config['FEED_SETTLE_SECONDS'])
+    return jsonify({
+        'events': [event.to_dict() for event in events],
+        'next_cursor': events[-1].id if events else after,
+        'has_more': has_more
+    })
+
+@feed_bp.route('/stream')
+def stream():
+    """Follow new events as NDJSON, one event per line, for up to FEED_STREAM_SECONDS.
+
+    Starts after ``after`` (default: the last acknowledged sequence). Idle
+    streams send a blank line every FEED_STREAM_HEARTBEAT seconds; when the
+    stream ends, reconnect with the last sequence received. Under the WSGI
+    server each open stream holds a worker thread; ``asgi.py`` serves the same
+    endpoint from a coroutine.
+    """
+    after = request.args.get('after', g.feed_consumer.acked_sequence, type=int)
+    return Response(stream_with_context(follow_events(after)),
+                    mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+def follow_events(after):
+    config = current_app.config
+    deadline = time.monotonic() + config['FEED_STREAM_SECONDS']
+    idle = 0
+    
+    while time.monotonic() < deadline:
+        events, has_more = ComplaintEvent.read_after(after, config['FEED_PAGE_SIZE'], config['FEED_SETTLE_SECONDS'])
+        lines = ''.join(event.to_json() + '\n' for event in events)
+        # End the read transaction so the pooled connection isn't held while idle
+        db.session.rollback()
+        
+        if events:
+            after, idle = events[-1].id, 0
+            yield lines
+            if has_more:
+                continue
+        elif idle >= config['FEED_STREAM_HEARTBEAT']:
+            idle = 0
+            yield '\n'
+        
+        time.sleep(config['FEED_STREAM_POLL_INTERVAL'])
+        idle += config['FEED_STREAM_POLL_INTERVAL']
+
+@feed_bp.route('/ack', methods=['POST'])
+def ack():
+    """Acknowledge every event up to and including a sequence number"""
+    data = request.get_json(silent=True) or {}
+    sequence = data.get('sequence')
+
+    if not isinstance(sequence, int) or sequence < 0:
+        return jsonify({'error': 'Request body must contain an integer "sequence".'}), 400
+
+    newest = db.session.scalar(ComplaintEvent.newest_sequence_statement())
+    if sequence > newest:
+        return jsonify({'error': f'Sequence {sequence} is past the newest event ({newest}).'}), 400
+
+    g.feed_consumer.ack(sequence)
+    db.session.commit()
+    return jsonify({'consumer': g.feed_consumer.name, 'acked_sequence': g.feed_consumer.acked_sequence})
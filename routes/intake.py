@@ -0,0 +1,155 @@
+"""Batch complaint intake API for hostel desks and kiosks"""
+from flask import Blueprint, jsonify, request, current_app
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+from models import db
+from models.complaint import Complaint
+from models.department import Department
+from models.feed import ComplaintEvent
+from models.intake import IntakeKey
+from models.notification import NotificationOutbox
+from models.stats import ComplaintStats
+from models.user import User
+from services.clustering import assign_cluster
+
+intake_bp = Blueprint('intake', __name__, url_prefix='/api/intake')
+
+PRIORITIES = ['Low', 'Medium', 'High', 'Urgent']
+
+@intake_bp.before_request
+def check_intake_user():
+    """Only wardens and admins may enter complaints on behalf of students"""
+    if not current_user.is_authenticated:
+        return jsonify({'error': 'Authentication required.'}), 401
+
+    if current_user.role not in ['warden', 'admin']:
+        return jsonify({'error': 'Access denied. Wardens and admins only.'}), 403
+
+def validate_item(item, students, departments):
+    """Return a list of problems with one batch item"""
+    errors = []
+    if not isinstance(item, dict):
+        return ['Item must be an object.']
+
+    if not str(item.get('key') or '').strip():
+        errors.append('key is required.')
+    elif len(str(item['key'])) > 100:
+        errors.append('key must be at most 100 characters.')
+    if str(item.get('registration_number') or '').strip() not in students:
+        errors.append('Unknown student registration_number.')
+    if str(item.get('department') or '').strip() not in departments:
+        errors.append('Unknown department.')
+    if not str(item.get('subject') or '').strip():
+        errors.append('subject is required.')
+    if not str(item.get('description') or '').strip():
+        errors.append('description is required.')
+    if item.get('priority', 'Medium') not in PRIORITIES:
+        errors.append(f"priority must be one of {', '.join(PRIORITIES)}.")
+    return errors
+
+def process_batch(items):
+    """Validate and insert a batch in a single transaction; returns per-item results"""
+    results = [None] * len(items)
+    valid = [(i, item) for i, item in enumerate(items) if isinstance(item, dict)]
+
+    # Already-processed keys are answered with their original ticket
+    keys = {str(item.get('key') or '').strip() for _, item in valid} - {''}
+    existing = {
+        intake_key.key: intake_key.complaint.ticket_id
+        for intake_key in IntakeKey.query.filter(
+            IntakeKey.created_by == current_user.id,
+            IntakeKey.key.in_(keys)
+        )
+    } if keys else {}
+
+    # Bulk lookups for students and departments (by name or ID)
+    registration_numbers = {str(item.get('registration_number') or '').strip() for _, item in valid}
+    students = {
+        user.registration_number: user
+        for user in User.query.filter(
+            User.role == 'student',
+            User.registration_number.in_(registration_numbers)
+        )
+    }
+    departments = {}
+    for department in Department.query.all():
+        departments[department.name] = department
+        departments[str(department.id)] = department
+
+    to_create = []
+    seen_keys = set()
+    for i, item in enumerate(items):
+        key = str(item.get('key') or '').strip() if isinstance(item, dict) else ''
+        if key in existing:
+            results[i] = {'index': i, 'key': key, 'status': 'duplicate', 'ticket_id': existing[key]}
+            continue
+
+        errors = validate_item(item, students, departments)
+        if not errors and key in seen_keys:
+            errors = ['key is repeated within this batch.']
+        if errors:
+            results[i] = {'index': i, 'key': key or None, 'status': 'error', 'errors': errors}
+            continue
+
+        seen_keys.add(key)
+        to_create.append((i, key, item))
+
+    ticket_ids = Complaint.generate_ticket_ids(len(to_create)) if to_create else []
+    created = []
+    for (i, key, item), ticket_id in zip(to_create, ticket_ids):
+        student = students[str(item['registration_number']).strip()]
+        complaint = Complaint(
+            ticket_id=ticket_id,
+            student_id=student.id,
+            department_id=departments[str(item['department']).strip()].id,
+            subject=str(item['subject']).strip(),
+            description=str(item['description']).strip(),
+            priority=item.get('priority', 'Medium'),
+            status='Pending',
+            room_number=student.room_number
+        )
+        complaint.refresh_due_at()
+        db.session.add(complaint)
+        created.append((i, key, complaint, student))
+
+    if created:
+        db.session.flush()  # Get the complaint IDs
+
+    for i, key, complaint, student in created:
+        db.session.add(IntakeKey(key=key, created_by=current_user.id, complaint_id=complaint.id))
+        assign_cluster(complaint, student.room_number)
+        NotificationOutbox.complaint_created(complaint)
+        ComplaintEvent.created(complaint, current_user.id)
+        results[i] = {'index': i, 'key': key, 'status': 'created', 'ticket_id': complaint.ticket_id}
+    ComplaintStats.complaints_filed([complaint for _, _, complaint, _ in created])
+
+    db.session.commit()
+    return results
+
+@intake_bp.route('/complaints', methods=['POST'])
+def batch_create():
+    """Create complaints in bulk on behalf of students.
+
+    Body: {"complaints": [{"key", "registration_number", "department",
+    "subject", "description", "priority"}, ...]} where ``department`` is a
+    department name or ID and ``key`` is a client-chosen idempotency key.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('complaints')
+
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Request body must contain a non-empty "complaints" array.'}), 400
+
+    max_batch = current_app.config['INTAKE_MAX_BATCH']
+    if len(items) > max_batch:
+        return jsonify({'error': f'At most {max_batch} complaints per batch.'}), 413
+
+    try:
+        results = process_batch(items)
+    except IntegrityError:
+        # A concurrent retry of the same batch won the race; its keys now resolve as duplicates
+        db.session.rollback()
+        results = process_batch(items)
+
+    summary = {status: sum(1 for r in results if r['status'] == status) for status in ['created', 'duplicate', 'error']}
+    return jsonify({'results': results, 'summary': summary})
@@ -1,20 +1,24 @@
 """Student routes"""
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from models import db
-from models.complaint import Complaint, ComplaintUpdate, Attachment
+from models.campus import current_campus
+from models.complaint import Complaint, ComplaintUpdate, ComplaintRead
 from models.department import Department
+from models.projections import ComplaintRow
+from models.feed import ComplaintEvent
+from models.notification import NotificationOutbox
+from models.stats import ComplaintStats
+from routes.utils import wants_json, timeline_response, stream_page
+from services.clustering import assign_cluster
+from services.media import queue_derivatives
+from services.uploads import allowed_file, upload_destination, build_attachment
 from config import Config
 import os
-from datetime import datetime
 
 student_bp = Blueprint('student', __name__, url_prefix='/student')
 
-def allowed_file(filename):
-    """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
-
 @student_bp.before_request
 def check_student():
     """Ensure only students can access these routes"""
@@ -32,18 +36,21 @@ def dashboard():
     # Get filter parameters
     status_filter = request.args.get('status', 'all')
     department_filter = request.args.get('department', 'all')
+    sort = request.args.get('sort', 'activity')
     
-    # Base query
-    query = Complaint.query.filter_by(student_id=current_user.id)
+    # Base query, with this student's read marker for unread badges
+    query = ComplaintRow.query(reader_id=current_user.id).filter(Complaint.student_id == current_user.id)
     
     # Apply filters
     if status_filter != 'all':
-        query = query.filter_by(status=status_filter)
+        query = query.filter(Complaint.status == status_filter)
     if department_filter != 'all':
-        query = query.filter_by(department_id=int(department_filter))
+        query = query.filter(Complaint.department_id == int(department_filter))
     
-    # Get complaints ordered by newest first
-    complaints = query.order_by(Complaint.created_at.desc()).all()
+    # Most recent activity first, or newest first; rows are fetched in batches as the table streams
+    order = Complaint.last_update_at if sort == 'activity' else Complaint.created_at
+    complaints = ComplaintRow.iterate(query.order_by(order.desc(), Complaint.id.desc()),
+                                      current_app.config['STREAM_BATCH_SIZE'])
     
     # Get statistics
     total_complaints = Complaint.query.filter_by(student_id=current_user.id).count()
@@ -54,8 +61,9 @@ def dashboard():
     # Get all departments for filter
     departments = Department.get_all()
     
-    return render_template('student/dashboard.html',
+    return stream_page('student/dashboard.html',
                          complaints=complaints,
+                         sort=sort,
                          total_complaints=total_complaints,
                          pending=pending,
                          in_progress=in_progress,
@@ -86,39 +94,42 @@ def submit_complaint():
             subject=subject,
             description=description,
             priority=priority,
-            status='Pending'
+            status='Pending',
+            room_number=current_user.room_number
         )
+        complaint.refresh_due_at()
         
         db.session.add(complaint)
         db.session.flush()  # Get the complaint ID
         
+        # Group with near-identical recent complaints (e.g. a block-wide outage)
+        assign_cluster(complaint, current_user.room_number)
+        
         # Handle file uploads
+        attachments = []
         files = request.files.getlist('attachments')
-        if files:
-            # Create upload directory if it doesn't exist
-            os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-            
-            for file in files:
-                if file and file.filename and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    unique_filename = f"{complaint.ticket_id}_{timestamp}_{filename}"
-                    filepath = os.path.join(Config.UPLOAD_FOLDER, unique_filename)
-                    
-                    file.save(filepath)
-                    
-                    # Create attachment record
-                    attachment = Attachment(
-                        complaint_id=complaint.id,
-                        file_name=filename,
-                        file_path=unique_filename,
-                        file_type=filename.rsplit('.', 1)[1].lower(),
-                        file_size=os.path.getsize(filepath)
-                    )
-                    db.session.add(attachment)
+        for file in files:
+            if file and file.filename and allowed_file(file.filename, Config.ALLOWED_EXTENSIONS):
+                filename = secure_filename(file.filename)
+                filepath, stored_path = upload_destination(Config.UPLOAD_FOLDER, current_campus(),
+                                                           complaint.ticket_id, filename)
+                
+                file.save(filepath)
+                
+                # Create attachment record
+                attachment = build_attachment(complaint.id, filename, stored_path, os.path.getsize(filepath))
+                db.session.add(attachment)
+                attachments.append(attachment)
         
+        NotificationOutbox.complaint_created(complaint)
+        ComplaintEvent.created(complaint, current_user.id)
+        ComplaintStats.complaints_filed([complaint])
         db.session.commit()
         
+        # Thumbnails and previews are generated off the request path
+        if attachments:
+            queue_derivatives(current_app._get_current_object(), [a.id for a in attachments])
+        
         flash(f'Complaint submitted successfully! Your ticket ID is: {complaint.ticket_id}', 'success')
         return redirect(url_for('student.view_complaint', ticket_id=complaint.ticket_id))
     
@@ -130,7 +141,50 @@ def submit_complaint():
 def view_complaint(ticket_id):
     """View complaint details"""
     complaint = Complaint.query.filter_by(ticket_id=ticket_id, student_id=current_user.id).first_or_404()
-    return render_template('student/view_complaint.html', complaint=complaint)
+    updates, has_more_updates = complaint.get_timeline()
+    ComplaintRead.mark_read(current_user.id, complaint.id)
+    return render_template('student/view_complaint.html',
+                         complaint=complaint,
+                         updates=updates,
+                         has_more_updates=has_more_updates)
+
+@student_bp.route('/complaint/<ticket_id>/attachments/<filename>', methods=['PUT'])
+def upload_attachment(ticket_id, filename):
+    """Add an attachment to a complaint from the raw request body (mobile and scripted clients)"""
+    complaint = Complaint.query.filter_by(ticket_id=ticket_id, student_id=current_user.id).first_or_404()
+    
+    filename = secure_filename(filename)
+    if not allowed_file(filename, Config.ALLOWED_EXTENSIONS):
+        return jsonify({'error': 'File type not allowed.'}), 400
+    
+    # End the read transaction so the pooled connection isn't held while the body arrives
+    complaint_id, ticket_id = complaint.id, complaint.ticket_id
+    db.session.rollback()
+    
+    # Werkzeug stops the stream with a 413 past MAX_CONTENT_LENGTH
+    filepath, stored_path = upload_destination(current_app.config['UPLOAD_FOLDER'], current_campus(),
+                                                       ticket_id, filename)
+    try:
+        with open(filepath, 'wb') as f:
+            while chunk := request.stream.read(current_app.config['UPLOAD_CHUNK_SIZE']):
+                f.write(chunk)
+    except Exception:
+        os.remove(filepath)
+        raise
+    
+    attachment = build_attachment(complaint_id, filename, stored_path, os.path.getsize(filepath))
+    db.session.add(attachment)
+    db.session.commit()
+    queue_derivatives(current_app._get_current_object(), [attachment.id])
+    return jsonify({'id': attachment.id, 'file_name': attachment.file_name, 'file_size': attachment.file_size}), 201
+
+@student_bp.route('/complaint/<ticket_id>/updates')
+def complaint_updates(ticket_id):
+    """Get timeline entries older or newer than a cursor"""
+    complaint = Complaint.query.filter_by(ticket_id=ticket_id, student_id=current_user.id).first_or_404()
+    return timeline_response(complaint, 'student/_update.html',
+                             before=request.args.get('before', type=int),
+                             after=request.args.get('after', type=int))
 
 @student_bp.route('/complaint/<ticket_id>/reply', methods=['POST'])
 def reply_complaint(ticket_id):
@@ -139,6 +193,8 @@ def reply_complaint(ticket_id):
     
     message = request.form.get('message', '').strip()
     if not message:
+        if wants_json():
+            return jsonify({'error': 'Please enter a message.'}), 400
         flash('Please enter a message.', 'danger')
         return redirect(url_for('student.view_complaint', ticket_id=ticket_id))
     
@@ -150,8 +206,16 @@ def reply_complaint(ticket_id):
         update_type='reply'
     )
     db.session.add(update)
-    complaint.updated_at = datetime.utcnow()
+    complaint.touch()
+    NotificationOutbox.complaint_updated(complaint, current_user, message)
+    ComplaintEvent.record(complaint, 'reply', current_user.id, role=current_user.role, message=message)
+    ComplaintRead.mark_read(current_user.id, complaint.id, commit=False)
     db.session.commit()
     
+    # Return only the entries the client hasn't seen yet
+    if wants_json():
+        return timeline_response(complaint, 'student/_update.html',
+                                 after=request.form.get('after', type=int))
+    
     flash('Reply added successfully.', 'success')
     return redirect(url_for('student.view_complaint', ticket_id=ticket_id))
@@ -0,0 +1,79 @@
+"""Shared route helpers"""
+from flask import Response, current_app, get_flashed_messages, jsonify, render_template, request, stream_template
+
+# Templates write this literal comment where streamed output should be sent right away
+STREAM_FLUSH = '<!-- flush -->'
+
+
+def wants_json():
+    """Check if the client asked for a JSON response"""
+    return request.accept_mimetypes.best == 'application/json'
+
+
+def timeline_response(complaint, template, before=None, after=None):
+    """Render a page of the complaint timeline as JSON entries (newest first)"""
+    updates, has_more = complaint.get_timeline(before=before, after=after)
+    return jsonify({
+        'entries': [
+            {'id': update.id, 'html': render_template(template, update=update)}
+            for update in updates
+        ],
+        'has_more': has_more
+    })
+
+
+def stream_page(template, **context):
+    """Render a template as a streamed response for pages with long tables.
+
+    Jinja yields many tiny strings, so output is sent in chunks of about
+    STREAM_CHUNK_SIZE, and everything before a ``<!-- flush -->`` marker is
+    sent as soon as it is rendered (the page header, before the table query
+    runs). Flashed messages are consumed up front because the session cookie
+    is written before the body starts streaming.
+    """
+    get_flashed_messages()
+    chunks = stream_template(template, **context)
+    return Response(_coalesce(chunks, current_app.config['STREAM_CHUNK_SIZE']),
+                    mimetype='text/html',
+                    headers={'X-Accel-Buffering': 'no'})
+
+
+def _coalesce(chunks, size):
+    buffer, length = [], 0
+    for chunk in chunks:
+        parts = chunk.split(STREAM_FLUSH)
+        for i, part in enumerate(parts):
+            if i and buffer:
+                yield ''.join(buffer)
+                buffer, length = [], 0
+            if part:
+                buffer.append(part)
+                length += len(part)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+class StreamedPage:
+    """One keyset page of a query, fetched in batches while the template iterates it.
+
+    ``next_cursor`` (the ID of the last row shown, or None on the last page)
+    is only known once iteration finishes, so templates read it after the loop.
+    """
+
+    def __init__(self, query, limit, batch_size):
+        self.query = query
+        self.limit = limit
+        self.batch_size = batch_size
+        self.next_cursor = None
+
+    def __iter__(self):
+        last = None
+        for count, row in enumerate(self.query.limit(self.limit + 1).yield_per(self.batch_size)):
+            if count == self.limit:
+                self.next_cursor = last.id
+                break
+            last = row
+            yield row
@@ -0,0 +1,228 @@
+"""Admission control for expensive write endpoints.
+
+Login (scrypt) and complaint submission (SQLite write lock) are guarded by:
+
+- per-IP and per-user token buckets, answered with 429 when a client is
+  sending faster than its allowance;
+- a per-endpoint concurrency limit with a short bounded wait queue. When the
+  queue is full the request is shed immediately with 503 and Retry-After
+  instead of piling up behind the slow path.
+
+Only POSTs to the configured endpoints are limited, so dashboards and other
+read-only pages stay responsive while writes are throttled.
+
+Token buckets live in process memory by default. With
+``ADMISSION_BACKEND = 'shared'`` they are kept in a fixed-size memory-mapped
+file so every worker of a pre-fork server on the same host shares them.
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from flask import g, render_template, request
+from flask_login import current_user
+
+try:
+    import fcntl
+except ImportError:  # Windows - shared backend unavailable
+    fcntl = None
+
+
+class EndpointLimiter:
+    """Concurrency limit with a bounded wait queue for one endpoint"""
+
+    def __init__(self, concurrency, queue_depth):
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout):
+        """Take a slot, waiting up to ``timeout`` seconds; False means shed"""
+        with self._cond:
+            if self.active < self.concurrency:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue_depth:
+                return False
+
+            self.waiting += 1
+            try:
+                if self._cond.wait_for(lambda: self.active < self.concurrency, timeout):
+                    self.active += 1
+                    return True
+                return False
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+def _refill(tokens, updated, rate, burst, now):
+    """Token bucket state after refilling; an all-zero slot is a fresh bucket"""
+    if updated == 0:
+        return float(burst)
+    return min(float(burst), tokens + (now - updated) * rate)
+
+
+def _retry_after(tokens, rate):
+    return max(1, math.ceil((1 - tokens) / rate))
+
+
+class MemoryBucketStore:
+    """Token buckets in a bounded LRU dict, private to this process"""
+
+    def __init__(self, max_keys=50000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now=None):
+        """Consume one token; returns (allowed, retry_after_seconds)"""
+        now = now or time.time()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (0.0, 0.0))
+            tokens = _refill(tokens, updated, rate, burst, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0 if allowed else _retry_after(tokens, rate)
+
+
+class SharedBucketStore:
+    """Token buckets in a memory-mapped file shared by all local workers.
+
+    The file is a fixed array of (tokens, updated) double pairs indexed by a
+    stable hash of the key. Colliding keys share a bucket, which can only
+    make limiting slightly stricter, never looser.
+
+    Each process opens the file itself on first use. flock() locks belong
+    to the open file description, so a descriptor inherited across the
+    pre-fork (``gunicorn --preload``) would let every worker hold the lock
+    at once.
+    """
+    SLOT = struct.Struct('dd')
+
+    def __init__(self, path, slots):
+        if fcntl is None:
+            raise RuntimeError('The shared admission backend requires fcntl (POSIX)')
+
+        self.path = path
+        self.slots = slots
+        self.size = slots * self.SLOT.size
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size != self.size:
+                os.ftruncate(fd, self.size)
+        finally:
+            os.close(fd)
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _file(self):
+        """This process's (descriptor, mapping) of the bucket file (call with _lock held)"""
+        if self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR)
+            self._map = mmap.mmap(self._fd, self.size)
+            self._pid = os.getpid()
+        return self._fd, self._map
+
+    def _offset(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        return (int.from_bytes(digest, 'big') % self.slots) * self.SLOT.size
+
+    def take(self, key, rate, burst, now=None):
+        """Consume one token; returns (allowed, retry_after_seconds)"""
+        now = now or time.time()
+        offset = self._offset(key)
+        with self._lock:
+            fd, buckets = self._file()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                tokens, updated = self.SLOT.unpack_from(buckets, offset)
+                tokens = _refill(tokens, updated, rate, burst, now)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                self.SLOT.pack_into(buckets, offset, tokens, now)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        return allowed, 0 if allowed else _retry_after(tokens, rate)
+
+
+def get_bucket_store(config):
+    if config['ADMISSION_BACKEND'] == 'shared':
+        return SharedBucketStore(config['ADMISSION_SHARED_PATH'], config['ADMISSION_SHARED_SLOTS'])
+    return MemoryBucketStore()
+
+
+def _client_user_key():
+    """Identify the user a write is for: the logged-in user, or this client's attempts on an email.
+
+    Login attempts are keyed on IP and email together, so nobody can drain
+    another user's login allowance (and lock them out) from elsewhere.
+    """
+    if current_user.is_authenticated:
+        return f'user:{current_user.get_id()}'
+    email = request.form.get('email', '').strip().lower()
+    return f'email:{request.remote_addr}:{email}' if email else None
+
+
+def init_admission(app):
+    """Install admission control on the endpoints listed in ADMISSION_LIMITS"""
+    limits = app.config['ADMISSION_LIMITS']
+    if not limits:
+        return
+
+    store = get_bucket_store(app.config)
+    limiters = {
+        endpoint: EndpointLimiter(rule['concurrency'], rule['queue'])
+        for endpoint, rule in limits.items()
+    }
+    queue_timeout = app.config['ADMISSION_QUEUE_TIMEOUT']
+    shed_retry_after = app.config['ADMISSION_RETRY_AFTER']
+
+    def reject(status, retry_after):
+        body = render_template(f'errors/{status}.html', retry_after=retry_after)
+        return body, status, {'Retry-After': str(retry_after)}
+
+    @app.before_request
+    def admit():
+        rule = limits.get(request.endpoint)
+        if rule is None or request.method != 'POST':
+            return None
+
+        # Cheap per-client checks first, so abusive clients never take a slot
+        keys = [(f'ip:{request.endpoint}:{request.remote_addr}', rule['ip_rate'], rule['ip_burst'])]
+        user_key = _client_user_key()
+        if user_key:
+            keys.append((f'{user_key}:{request.endpoint}', rule['user_rate'], rule['user_burst']))
+        for key, rate, burst in keys:
+            allowed, retry_after = store.take(key, rate, burst)
+            if not allowed:
+                return reject(429, retry_after)
+
+        limiter = limiters[request.endpoint]
+        if not limiter.acquire(queue_timeout):
+            app.logger.warning('Shedding %s: %d active, %d queued', request.endpoint, limiter.active, limiter.waiting)
+            return reject(503, shed_retry_after)
+        g.admission_limiter = limiter
+        return None
+
+    @app.teardown_request
+    def release_admission(exc):
+        limiter = g.pop('admission_limiter', None)
+        if limiter is not None:
+            limiter.release()
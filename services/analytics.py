@@ -0,0 +1,203 @@
+"""Columnar analytics snapshots.
+
+``analytics_snapshot.py`` periodically exports complaints (with a few
+per-complaint facts from complaint_updates) into one NumPy array per
+column. Text columns are dictionary-encoded into small integer codes, so
+report queries are answered from memory-mapped arrays with vectorized
+group-by (``np.bincount`` over combined codes) and never touch the live
+database.
+
+Each campus has its own store under ``ANALYTICS_DIR/<campus>``::
+
+    CURRENT            name of the active generation (swapped atomically)
+    <generation>/
+        meta.json      row count, build time, dictionaries per column
+        <column>.npy
+"""
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+import numpy as np
+from sqlalchemy import func
+from models import db
+from models.complaint import Complaint, ComplaintUpdate
+from models.department import Department
+from models.user import User
+from services.clustering import room_block
+
+# Dictionary-encoded dimensions available for grouping and filtering
+DIMENSIONS = ['department', 'priority', 'status', 'room', 'block', 'week', 'month']
+
+# Numeric measures; NaN where not applicable (e.g. unresolved complaints)
+MEASURES = ['resolution_hours', 'first_response_hours', 'update_count']
+
+KEEP_GENERATIONS = 2
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _encode(values):
+    """Dictionary-encode a list of strings into (codes, dictionary)"""
+    dictionary = sorted({v for v in values})
+    index = {v: i for i, v in enumerate(dictionary)}
+    dtype = np.uint8 if len(dictionary) <= 0xFF else np.uint16 if len(dictionary) <= 0xFFFF else np.uint32
+    return np.fromiter((index[v] for v in values), dtype=dtype, count=len(values)), dictionary
+
+
+def _hours(start, end):
+    if start is None or end is None:
+        return np.nan
+    return (end - start).total_seconds() / 3600
+
+
+def snapshot_directory(config, campus):
+    """Snapshot store for one campus"""
+    return os.path.join(config['ANALYTICS_DIR'], campus)
+
+
+def export_snapshot(directory):
+    """Write a new snapshot generation from the live database. Returns the row count."""
+    # First non-student response per complaint, and update counts, in one grouped query
+    staff_updates = db.session.query(
+        ComplaintUpdate.complaint_id,
+        func.count(ComplaintUpdate.id).label('updates'),
+        func.min(db.case((User.role != 'student', ComplaintUpdate.created_at))).label('first_response')
+    ).join(User, ComplaintUpdate.user_id == User.id).group_by(ComplaintUpdate.complaint_id).subquery()
+
+    rows = db.session.query(
+        Complaint.created_at,
+        Complaint.resolved_at,
+        Complaint.status,
+        Complaint.priority,
+        Department.name,
+        User.room_number,
+        staff_updates.c.updates,
+        staff_updates.c.first_response
+    ).join(Department, Complaint.department_id == Department.id).join(
+        User, Complaint.student_id == User.id
+    ).outerjoin(staff_updates, staff_updates.c.complaint_id == Complaint.id).yield_per(5000)
+
+    columns = {name: [] for name in DIMENSIONS + MEASURES}
+    for created, resolved, status, priority, department, room, updates, first_response in rows:
+        if isinstance(first_response, str):  # SQLite returns MIN() over datetimes as text
+            first_response = datetime.fromisoformat(first_response)
+        iso = created.isocalendar()
+        columns['department'].append(department)
+        columns['priority'].append(priority or 'Medium')
+        columns['status'].append(status or 'Pending')
+        columns['room'].append(room or 'N/A')
+        columns['block'].append(room_block(room) or 'N/A')
+        columns['week'].append(f'{iso[0]}-W{iso[1]:02d}')
+        columns['month'].append(created.strftime('%Y-%m'))
+        columns['resolution_hours'].append(_hours(created, resolved))
+        columns['first_response_hours'].append(_hours(created, first_response))
+        columns['update_count'].append(updates or 0)
+
+    generation = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    target = os.path.join(directory, generation)
+    os.makedirs(target)
+
+    dictionaries = {}
+    for name in DIMENSIONS:
+        codes, dictionaries[name] = _encode(columns[name])
+        np.save(os.path.join(target, f'{name}.npy'), codes)
+    for name in MEASURES:
+        dtype = np.uint32 if name == 'update_count' else np.float32
+        np.save(os.path.join(target, f'{name}.npy'), np.asarray(columns[name], dtype=dtype))
+
+    row_count = len(columns['department'])
+    with open(os.path.join(target, 'meta.json'), 'w') as f:
+        json.dump({
+            'rows': row_count,
+            'built_at': datetime.utcnow().isoformat(),
+            'dictionaries': dictionaries
+        }, f)
+
+    # Publish atomically, then drop old generations
+    pointer = os.path.join(directory, 'CURRENT')
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(generation)
+    os.replace(pointer + '.tmp', pointer)
+
+    generations = sorted(d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d)))
+    for old in generations[:-KEEP_GENERATIONS]:
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+
+    return row_count
+
+
+class Snapshot:
+    """A read-only, memory-mapped snapshot generation"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.rows = meta['rows']
+        self.built_at = datetime.fromisoformat(meta['built_at'])
+        self.dictionaries = meta['dictionaries']
+        self.columns = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in DIMENSIONS + MEASURES
+        }
+
+    def mask(self, filters):
+        """Boolean row mask for {dimension: [values]} filters"""
+        mask = np.ones(self.rows, dtype=bool)
+        for name, values in filters.items():
+            dictionary = self.dictionaries[name]
+            codes = [dictionary.index(v) for v in values if v in dictionary]
+            mask &= np.isin(self.columns[name], codes)
+        return mask
+
+    def aggregate(self, group_by, measure='count', filters=None, min_count=1):
+        """Group rows by dimensions and compute the row count or the mean of a measure.
+
+        Returns a list of (key_tuple, count, value) sorted by key.
+        """
+        mask = self.mask(filters or {})
+        if measure != 'count':
+            mask &= ~np.isnan(self.columns[measure].astype(np.float64))
+
+        sizes = [len(self.dictionaries[d]) for d in group_by]
+        if group_by:
+            codes = [np.asarray(self.columns[d])[mask].astype(np.int64) for d in group_by]
+            keys = np.ravel_multi_index(codes, sizes)
+        else:
+            keys = np.zeros(int(mask.sum()), dtype=np.int64)
+
+        # Compact the combined keys so sparse high-cardinality groupings stay cheap
+        groups, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(groups))
+        if measure == 'count':
+            values = counts.astype(np.float64)
+        else:
+            measured = np.asarray(self.columns[measure])[mask].astype(np.float64)
+            values = np.bincount(inverse, weights=measured, minlength=len(groups)) / np.maximum(counts, 1)
+
+        keep = counts >= max(min_count, 1)
+        result = []
+        for flat, count, value in zip(groups[keep], counts[keep], values[keep]):
+            index = np.unravel_index(flat, sizes) if group_by else ()
+            key = tuple(self.dictionaries[d][i] for d, i in zip(group_by, index))
+            result.append((key, int(count), round(float(value), 1)))
+        return result
+
+
+def load_snapshot(directory):
+    """Return the current Snapshot (cached until a new generation is published), or None"""
+    pointer = os.path.join(directory, 'CURRENT')
+    try:
+        with open(pointer) as f:
+            generation = f.read().strip()
+    except FileNotFoundError:
+        return None
+
+    with _cache_lock:
+        cached = _cache.get(directory)
+        if cached is None or cached[0] != generation:
+            cached = (generation, Snapshot(os.path.join(directory, generation)))
+            _cache[directory] = cached
+        return cached[1]
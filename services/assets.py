@@ -0,0 +1,59 @@
+"""Fingerprinted static assets.
+
+``build_assets.py`` copies CSS/JS into ``static/dist`` under content-hashed
+names, writes ``.gz``/``.br`` siblings and a manifest. At runtime the
+manifest rewrites ``url_for('static', ...)`` to the hashed name, and those
+files are served with far-future immutable caching and the best
+precompressed variant the client accepts.
+"""
+import json
+import mimetypes
+import os
+from flask import request, send_from_directory
+
+DIST_DIR = 'dist'
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def load_manifest(path):
+    """Map source filenames (css/style.css) to fingerprinted ones (dist/css/style.<hash>.css)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def init_assets(app):
+    """Rewrite static URLs through the manifest and serve hashed files with long-lived caching"""
+    manifest = load_manifest(app.config['ASSET_MANIFEST'])
+    fingerprinted = set(manifest.values())
+    max_age = app.config['ASSET_MAX_AGE']
+    default_static = app.view_functions['static']
+
+    @app.url_defaults
+    def fingerprint_static_url(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    def static(filename):
+        if filename not in fingerprinted:
+            return default_static(filename=filename)
+
+        mimetype = mimetypes.guess_type(filename)[0]
+        served, encoding = filename, None
+        for name, suffix in ENCODINGS:
+            if name in request.accept_encodings and os.path.exists(os.path.join(app.static_folder, filename + suffix)):
+                served, encoding = filename + suffix, name
+                break
+
+        response = send_from_directory(app.static_folder, served, mimetype=mimetype, max_age=max_age)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = f'public, max-age={max_age}, immutable'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = static
+    app.extensions['asset_manifest'] = manifest
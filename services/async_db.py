@@ -0,0 +1,50 @@
+"""Async database access for the ASGI serving mode.
+
+``asgi.py`` serves the I/O-bound endpoints from coroutines, which can't use
+the thread-bound Flask-SQLAlchemy session. Each campus gets an async engine
+on the same database as its sync engine (aiosqlite for SQLite, asyncpg for
+PostgreSQL), and handlers open a short-lived ``AsyncSession`` per query or
+transaction. The models and their SELECT builders are shared with the sync
+code; only the execution is awaited.
+"""
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from models import db
+from models.campus import campus_bind_key
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg'
+}
+
+
+def async_url(url):
+    """Same database URL with the dialect's async driver"""
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend} databases')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+class AsyncDatabase:
+    """One async engine and session factory per campus"""
+
+    def __init__(self, app):
+        self.sessionmakers = {}
+        self.engines = {}
+        with app.app_context():
+            for code, campus in app.config['CAMPUSES'].items():
+                if code == app.config['DEFAULT_CAMPUS']:
+                    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+                else:
+                    options = campus.get('engine_options') or {}
+                url = db.engines[campus_bind_key(code)].url
+                self.engines[code] = create_async_engine(async_url(url), **options)
+                self.sessionmakers[code] = async_sessionmaker(self.engines[code], expire_on_commit=False)
+
+    def session(self, campus):
+        """New AsyncSession on a campus's database (use as ``async with``)"""
+        return self.sessionmakers[campus]()
+
+    async def dispose(self):
+        for engine in self.engines.values():
+            await engine.dispose()
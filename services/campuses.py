@@ -0,0 +1,76 @@
+"""Cross-campus rollups.
+
+Every campus lives in its own database, so deployment-wide numbers are
+computed by running the same summary query against each campus in parallel
+(one thread and one pooled connection per campus) and merging the results.
+A slow or unavailable campus is reported as missing instead of holding up
+the others.
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from models import db
+from models.campus import campus_context
+from models.complaint import Complaint
+from models.department import Department
+from models.user import User
+
+# Counters summed across campuses by merge_summaries
+COUNTERS = ['by_status', 'by_priority', 'by_department']
+
+
+def fan_out(app, fn, timeout):
+    """Call ``fn()`` once per campus in parallel.
+
+    Returns ``(results, errors)`` keyed by campus code; campuses that raise or
+    don't answer within ``timeout`` seconds appear only in ``errors``.
+    """
+    campuses = list(app.config['CAMPUSES'])
+    executor = ThreadPoolExecutor(max_workers=len(campuses), thread_name_prefix='campus')
+    futures = {executor.submit(_run_for_campus, app, code, fn): code for code in campuses}
+    done, _ = wait(futures, timeout=timeout)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results, errors = {}, {}
+    for future, code in futures.items():
+        if future not in done:
+            errors[code] = 'Timed out'
+        elif future.exception() is not None:
+            app.logger.error('Campus %s rollup failed: %s', code, future.exception())
+            errors[code] = 'Unavailable'
+        else:
+            results[code] = future.result()
+    return results, errors
+
+
+def _run_for_campus(app, code, fn):
+    with campus_context(app, code):
+        return fn()
+
+
+def campus_summary():
+    """Complaint and user counts for the current campus"""
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    return {
+        'students': User.query.filter_by(role='student').count(),
+        'recent': Complaint.query.filter(Complaint.created_at >= thirty_days_ago).count(),
+        'by_status': dict(db.session.query(Complaint.status, func.count(Complaint.id)).group_by(Complaint.status).all()),
+        'by_priority': dict(db.session.query(Complaint.priority, func.count(Complaint.id)).group_by(Complaint.priority).all()),
+        'by_department': dict(db.session.query(Department.name, func.count(Complaint.id)).join(
+            Complaint, Complaint.department_id == Department.id
+        ).group_by(Department.name).all())
+    }
+
+
+def merge_summaries(summaries):
+    """Deployment-wide totals from per-campus summaries"""
+    total = {'students': 0, 'recent': 0}
+    counters = {name: Counter() for name in COUNTERS}
+    for summary in summaries:
+        total['students'] += summary['students']
+        total['recent'] += summary['recent']
+        for name in COUNTERS:
+            counters[name].update(summary[name])
+    total.update({name: dict(counter) for name, counter in counters.items()})
+    return total
@@ -0,0 +1,136 @@
+"""Near-duplicate clustering of incoming complaints.
+
+Each complaint's subject and description are reduced to a MinHash signature
+over word shingles. The signature is split into LSH bands; complaints that
+share any band within the same department and time window land in the same
+cluster. Assignment touches only the handful of bucket rows for the new
+complaint's bands, never older complaints themselves.
+"""
+import hashlib
+import random
+import re
+import zlib
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from models import db
+from models.campus import current_campus
+from models.cluster import ComplaintCluster, ClusterBucket
+
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_HASHES = NUM_BANDS * ROWS_PER_BAND
+SHINGLE_SIZE = 2
+
+# Largest 32-bit prime; coefficients are fixed so signatures are stable across processes
+_PRIME = 4294967291
+_rng = random.Random(20250115)
+_HASH_PARAMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# (campus, department_id) -> last time window this process pruned buckets for
+_pruned_windows = {}
+
+
+def shingles(text):
+    """Word n-grams of the normalized text"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        return set(tokens)
+    return {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """MinHash signature of the text's shingle set"""
+    hashed = [zlib.crc32(s.encode('utf-8')) for s in shingles(text)]
+    if not hashed:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashed) for a, b in _HASH_PARAMS]
+
+
+def band_hashes(signature):
+    """One signed 64-bit hash per LSH band"""
+    hashes = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        data = f'{band}:' + ','.join(map(str, rows))
+        digest = hashlib.blake2b(data.encode('ascii'), digest_size=8).digest()
+        hashes.append(int.from_bytes(digest, 'big', signed=True))
+    return hashes
+
+
+def room_block(room_number):
+    """Block/wing part of a room number, e.g. 'A-101' -> 'A', 'B204' -> 'B'"""
+    if not room_number:
+        return None
+    room = room_number.strip().upper()
+    for sep in '-/ ':
+        if sep in room:
+            return room.split(sep, 1)[0]
+    return room.rstrip('0123456789') or room[:1]
+
+
+def time_window(when):
+    """Index of the clustering time window containing ``when``"""
+    seconds = current_app.config['CLUSTER_WINDOW_HOURS'] * 3600
+    return int(when.timestamp() // seconds)
+
+
+def assign_cluster(complaint, room_number=None):
+    """Attach a new complaint to a matching cluster, or start a new one.
+
+    Candidates are clusters sharing at least one LSH band in the current or
+    previous time window. Clusters from the same room block win over better
+    textual matches elsewhere. Buckets from older windows are never read
+    again; they are deleted the first time a window is used, so the bucket
+    table stays bounded without a DELETE on every submit. The caller
+    commits.
+    """
+    signature = minhash_signature(f'{complaint.subject} {complaint.description}')
+    if signature is None:
+        return None
+
+    hashes = band_hashes(signature)
+    block = room_block(room_number)
+    now = complaint.created_at or datetime.utcnow()
+    window = time_window(now)
+
+    matches = Counter(
+        cluster_id for (cluster_id,) in db.session.query(ClusterBucket.cluster_id).filter(
+            ClusterBucket.department_id == complaint.department_id,
+            ClusterBucket.time_window.in_([window, window - 1]),
+            ClusterBucket.band_hash.in_(hashes)
+        )
+    )
+
+    cluster = None
+    if matches:
+        candidates = ComplaintCluster.query.filter(ComplaintCluster.id.in_(matches.keys())).all()
+        cluster = max(candidates, key=lambda c: (c.room_block == block, matches[c.id], c.last_seen_at))
+
+    if cluster is None:
+        cluster = ComplaintCluster(department_id=complaint.department_id, room_block=block, size=0)
+        db.session.add(cluster)
+        db.session.flush()
+
+    cluster.size += 1
+    cluster.last_seen_at = now
+    complaint.cluster_id = cluster.id
+
+    prune_key = (current_campus(), complaint.department_id)
+    if _pruned_windows.get(prune_key) != window:
+        ClusterBucket.query.filter(
+            ClusterBucket.department_id == complaint.department_id,
+            ClusterBucket.time_window < window - 1
+        ).delete(synchronize_session=False)
+        _pruned_windows[prune_key] = window
+
+    for band_hash in set(hashes):
+        db.session.add(ClusterBucket(
+            department_id=complaint.department_id,
+            time_window=window,
+            band_hash=band_hash,
+            cluster_id=cluster.id
+        ))
+    return cluster
@@ -0,0 +1,115 @@
+"""Change-data feed export and compaction.
+
+``feed_worker.py`` appends new complaint events to NDJSON segment files under
+``FEED_DIR/<campus>``, one JSON object per line in sequence order. Segment
+``events-<first>.ndjson`` holds sequences ``first`` to
+``first + FEED_SEGMENT_EVENTS - 1``, so a local reader resuming from sequence
+N opens the segment containing N and skips ahead.
+
+The exporter is itself a registered consumer (``ndjson-tail``), so events
+are never compacted out of the database before they reach the files. Rows
+and whole segments at or below the lowest acknowledged sequence across all
+consumers are deleted.
+"""
+import json
+import os
+from flask import current_app
+from models import db
+from models.feed import ComplaintEvent, FeedConsumer
+
+TAIL_CONSUMER = 'ndjson-tail'
+
+
+def segment_start(sequence, segment_events):
+    """First sequence of the segment that holds ``sequence``"""
+    return (sequence - 1) // segment_events * segment_events + 1
+
+
+def segment_path(directory, start):
+    return os.path.join(directory, f'events-{start:012d}.ndjson')
+
+
+def list_segments(directory):
+    """(start, path) of every segment in the directory, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    segments = []
+    for name in os.listdir(directory):
+        if name.startswith('events-') and name.endswith('.ndjson'):
+            segments.append((int(name[len('events-'):-len('.ndjson')]), os.path.join(directory, name)))
+    return sorted(segments)
+
+
+def last_exported_sequence(directory):
+    """Sequence of the last complete line in the newest segment, or 0"""
+    segments = list_segments(directory)
+    if not segments:
+        return 0
+    with open(segments[-1][1], 'rb') as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    for line in reversed(lines):
+        try:
+            return json.loads(line)['sequence']
+        except ValueError:
+            continue  # torn write from a crash; the event is exported again
+    return 0
+
+
+def get_tail_consumer():
+    consumer = FeedConsumer.query.filter_by(name=TAIL_CONSUMER).first()
+    if consumer is None:
+        consumer = FeedConsumer(name=TAIL_CONSUMER)
+        db.session.add(consumer)
+        db.session.commit()
+    return consumer
+
+
+def export_events(directory, batch_size=None):
+    """Append one batch of new events to the NDJSON segments. Returns the number written."""
+    config = current_app.config
+    batch_size = batch_size or config['FEED_PAGE_SIZE']
+    segment_events = config['FEED_SEGMENT_EVENTS']
+    os.makedirs(directory, exist_ok=True)
+
+    consumer = get_tail_consumer()
+    position = max(consumer.acked_sequence, last_exported_sequence(directory))
+    events, _ = ComplaintEvent.read_after(position, batch_size, config['FEED_SETTLE_SECONDS'])
+    if not events:
+        return 0
+
+    handle, current = None, None
+    try:
+        for event in events:
+            start = segment_start(event.id, segment_events)
+            if start != current:
+                if handle:
+                    handle.close()
+                handle, current = open(segment_path(directory, start), 'a', encoding='utf-8'), start
+            handle.write(event.to_json() + '\n')
+        handle.flush()
+        os.fsync(handle.fileno())
+    finally:
+        if handle:
+            handle.close()
+
+    consumer.ack(events[-1].id)
+    db.session.commit()
+    return len(events)
+
+
+def compact(directory):
+    """Drop events and segments every consumer has acknowledged. Returns (rows, segments) removed."""
+    point = FeedConsumer.compaction_point()
+    if not point:
+        return 0, 0
+
+    rows = ComplaintEvent.query.filter(ComplaintEvent.id <= point).delete(synchronize_session=False)
+    db.session.commit()
+
+    segment_events = current_app.config['FEED_SEGMENT_EVENTS']
+    removed = 0
+    for start, path in list_segments(directory):
+        if start + segment_events - 1 <= point:
+            os.remove(path)
+            removed += 1
+    return rows, removed
@@ -0,0 +1,157 @@
+"""Attachment derivative pipeline.
+
+After an upload commits, attachments are handed to a small thread pool that
+writes resized thumbnails and web-optimized previews for images, and poster
+frames for videos when ffmpeg is available. Derivatives live under
+``UPLOAD_FOLDER/derived`` (mirroring the per-campus upload directories) and
+their paths are stored on the Attachment row. Pillow is imported on the
+first derivative job, not when the app starts.
+
+Jobs only live in this process's pool, so an attachment whose job was lost
+to a restart stays ``pending``; ``regenerate_derivatives.py`` finds those
+rows and processes them again.
+"""
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from models import db
+from models.campus import campus_context, current_campus
+from models.complaint import Attachment
+
+IMAGE_TYPES = {'png', 'jpg', 'jpeg', 'gif'}
+# Served as uploaded: a JPEG preview would drop the animation
+ORIGINAL_ONLY_TYPES = {'gif'}
+VIDEO_TYPES = {'mp4', 'avi', 'mov'}
+DERIVED_DIR = 'derived'
+
+_executor = None
+
+
+def get_executor(app):
+    """Lazily create the shared derivative worker pool"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config['MEDIA_WORKERS'],
+            thread_name_prefix='media'
+        )
+    return _executor
+
+
+def queue_derivatives(app, attachment_ids):
+    """Generate derivatives for committed attachments in the background"""
+    executor = get_executor(app)
+    campus = current_campus()
+    for attachment_id in attachment_ids:
+        executor.submit(process_attachment, app, campus, attachment_id)
+
+
+def stale_attachment_ids(stale_minutes, statuses=('pending',)):
+    """IDs of attachments still in one of ``statuses`` after ``stale_minutes`` (current campus)"""
+    cutoff = datetime.utcnow() - timedelta(minutes=stale_minutes)
+    return [attachment_id for (attachment_id,) in db.session.query(Attachment.id).filter(
+        Attachment.derivative_status.in_(statuses),
+        Attachment.uploaded_at < cutoff
+    ).order_by(Attachment.id)]
+
+
+def process_attachment(app, campus, attachment_id):
+    """Generate one attachment's derivatives, marking it failed on error"""
+    with campus_context(app, campus):
+        try:
+            generate_derivatives(attachment_id, app.config)
+        except Exception:
+            app.logger.exception('Derivative generation failed for attachment %s', attachment_id)
+            db.session.rollback()
+            attachment = db.session.get(Attachment, attachment_id)
+            if attachment:
+                attachment.derivative_status = 'failed'
+                db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def flatten(image):
+    """RGB copy of an image, with any transparency composited onto white"""
+    from PIL import Image
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def save_resized(image, path, max_size, quality):
+    """Save a progressive JPEG no larger than max_size on either side"""
+    from PIL import Image
+    resized = image.copy()
+    resized.thumbnail((max_size, max_size), Image.LANCZOS)
+    resized.save(path, 'JPEG', quality=quality, optimize=True, progressive=True)
+
+
+def extract_poster(video_path, poster_path, width):
+    """Grab a frame near the start of a video; returns False if ffmpeg is unavailable"""
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        return False
+
+    result = subprocess.run(
+        [ffmpeg, '-y', '-loglevel', 'error', '-ss', '1', '-i', video_path,
+         '-frames:v', '1', '-vf', f'scale={width}:-2', poster_path],
+        capture_output=True, timeout=60
+    )
+    # Very short clips have no frame at 1s; fall back to the first frame
+    if result.returncode != 0 or not os.path.exists(poster_path):
+        result = subprocess.run(
+            [ffmpeg, '-y', '-loglevel', 'error', '-i', video_path,
+             '-frames:v', '1', '-vf', f'scale={width}:-2', poster_path],
+            capture_output=True, timeout=60
+        )
+    return result.returncode == 0 and os.path.exists(poster_path)
+
+
+def generate_derivatives(attachment_id, config):
+    """Write thumbnail/preview/poster files for one attachment"""
+    from PIL import Image, ImageOps
+    attachment = db.session.get(Attachment, attachment_id)
+    if attachment is None:
+        return
+
+    upload_folder = config['UPLOAD_FOLDER']
+    source = os.path.join(upload_folder, attachment.file_path)
+    stem = os.path.splitext(attachment.file_path)[0]
+    os.makedirs(os.path.dirname(os.path.join(upload_folder, DERIVED_DIR, stem)), exist_ok=True)
+    thumb_rel = f'{DERIVED_DIR}/{stem}_thumb.jpg'
+    thumb_size = config['THUMBNAIL_SIZE']
+
+    if attachment.file_type in IMAGE_TYPES:
+        preview_rel = None
+        with Image.open(source) as image:
+            image = flatten(ImageOps.exif_transpose(image))
+            if attachment.file_type not in ORIGINAL_ONLY_TYPES:
+                preview_rel = f'{DERIVED_DIR}/{stem}_preview.jpg'
+                save_resized(image, os.path.join(upload_folder, preview_rel), config['PREVIEW_SIZE'], 82)
+            save_resized(image, os.path.join(upload_folder, thumb_rel), thumb_size, 75)
+        attachment.preview_path = preview_rel
+        attachment.thumbnail_path = thumb_rel
+        attachment.derivative_status = 'ready'
+
+    elif attachment.file_type in VIDEO_TYPES:
+        poster_rel = f'{DERIVED_DIR}/{stem}_poster.jpg'
+        poster = os.path.join(upload_folder, poster_rel)
+        if extract_poster(source, poster, config['PREVIEW_SIZE']):
+            with Image.open(poster) as image:
+                save_resized(flatten(image), os.path.join(upload_folder, thumb_rel), thumb_size, 75)
+            attachment.poster_path = poster_rel
+            attachment.thumbnail_path = thumb_rel
+            attachment.derivative_status = 'ready'
+        else:
+            attachment.derivative_status = 'none'
+
+    else:
+        attachment.derivative_status = 'none'
+
+    db.session.commit()
@@ -0,0 +1,139 @@
+"""Email notification delivery.
+
+Drains the notification outbox in batches, coalescing pending events for
+the same recipient into a single digest email. Delivery goes through a
+pluggable transport selected by ``MAIL_TRANSPORT``.
+"""
+import os
+import smtplib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from flask import current_app
+from models import db
+from models.notification import NotificationOutbox
+
+
+class SMTPTransport:
+    """Send mail through an SMTP server (also works against a local debug server)"""
+
+    def __init__(self, host, port, username=None, password=None, use_tls=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send(self, messages):
+        """Send a list of EmailMessage objects over one connection"""
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                smtp.send_message(message)
+
+
+class FileTransport:
+    """Write each message as an .eml file, for development and testing"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def send(self, messages):
+        os.makedirs(self.directory, exist_ok=True)
+        for message in messages:
+            timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')
+            recipient = message['To'].replace('@', '_at_')
+            path = os.path.join(self.directory, f'{timestamp}_{recipient}.eml')
+            with open(path, 'wb') as f:
+                f.write(bytes(message))
+
+
+def get_transport(config):
+    """Build the transport configured by MAIL_TRANSPORT"""
+    if config['MAIL_TRANSPORT'] == 'file':
+        return FileTransport(config['MAIL_FILE_DIR'])
+    if config['MAIL_TRANSPORT'] == 'smtp':
+        return SMTPTransport(
+            config['MAIL_SERVER'],
+            config['MAIL_PORT'],
+            username=config['MAIL_USERNAME'],
+            password=config['MAIL_PASSWORD'],
+            use_tls=config['MAIL_USE_TLS']
+        )
+    raise ValueError(f"Unknown MAIL_TRANSPORT: {config['MAIL_TRANSPORT']}")
+
+
+def build_digest(recipient, events, sender):
+    """Combine all pending events for one recipient into one email"""
+    message = EmailMessage()
+    message['From'] = sender
+    message['To'] = recipient
+
+    if len(events) == 1:
+        event = events[0]
+        message['Subject'] = f'[{event.ticket_id}] {event.subject}'
+    else:
+        tickets = {event.ticket_id for event in events}
+        message['Subject'] = f'{len(events)} complaint updates on {len(tickets)} ticket(s)'
+
+    lines = []
+    for event in events:
+        title = event.event_type.replace('_', ' ').title()
+        lines.append(f'[{event.ticket_id}] {event.subject} - {title}')
+        lines.append(f"  {event.created_at.strftime('%d %b %Y, %I:%M %p')}")
+        lines.append(f'  {event.message}')
+        lines.append('')
+    message.set_content('\n'.join(lines))
+    return message
+
+
+def retry_delay(attempts, base_seconds):
+    """Exponential backoff, capped at one day"""
+    return timedelta(seconds=min(base_seconds * (2 ** (attempts - 1)), 24 * 3600))
+
+
+def drain_outbox(transport=None, batch_size=None):
+    """Deliver one batch of pending notifications. Returns the number of events handled."""
+    config = current_app.config
+    transport = transport or get_transport(config)
+    batch_size = batch_size or config['NOTIFICATION_BATCH_SIZE']
+    now = datetime.utcnow()
+
+    # SKIP LOCKED lets several workers share the outbox on PostgreSQL; SQLite ignores it
+    events = NotificationOutbox.query.filter(
+        NotificationOutbox.status == 'pending',
+        NotificationOutbox.next_attempt_at <= now
+    ).order_by(NotificationOutbox.id).limit(batch_size).with_for_update(skip_locked=True).all()
+
+    if not events:
+        db.session.commit()
+        return 0
+
+    by_recipient = OrderedDict()
+    for event in events:
+        by_recipient.setdefault(event.recipient, []).append(event)
+
+    for recipient, recipient_events in by_recipient.items():
+        try:
+            transport.send([build_digest(recipient, recipient_events, config['MAIL_DEFAULT_SENDER'])])
+        except Exception as e:
+            for event in recipient_events:
+                event.attempts += 1
+                event.last_error = str(e)
+                if event.attempts >= config['NOTIFICATION_MAX_ATTEMPTS']:
+                    event.status = 'failed'
+                else:
+                    event.next_attempt_at = now + retry_delay(event.attempts, config['NOTIFICATION_RETRY_BASE_SECONDS'])
+            current_app.logger.warning('Notification delivery to %s failed: %s', recipient, e)
+        else:
+            for event in recipient_events:
+                event.attempts += 1
+                event.status = 'sent'
+                event.sent_at = now
+
+    db.session.commit()
+    return len(events)
@@ -0,0 +1,59 @@
+"""Full rebuild of the per-student and per-room complaint statistics.
+
+Filings and status changes keep ``complaint_stats`` current incrementally
+(see models/stats.py). Both paths key a complaint's room counters on the
+``room_number`` stored on the complaint when it was filed, so a rebuild
+reproduces the incremental rows exactly. Run it on first deployment and
+after bulk imports or data fixes.
+"""
+from collections import Counter
+from datetime import datetime
+from models import db
+from models.complaint import Complaint
+from models.stats import ComplaintStats, RESOLUTION_BUCKETS, contribution, stats_keys
+from models.user import User
+
+COUNTER_COLUMNS = ['open_count', 'resolved_count'] + [column for _, column in RESOLUTION_BUCKETS]
+
+
+def backfill_room_numbers():
+    """Store a room on complaints filed before it was recorded, from the student's current room"""
+    students = db.session.query(User.id, User.room_number).join(
+        Complaint, Complaint.student_id == User.id
+    ).filter(Complaint.room_number.is_(None), User.room_number.isnot(None)).distinct().all()
+
+    for student_id, room_number in students:
+        Complaint.query.filter(
+            Complaint.student_id == student_id,
+            Complaint.room_number.is_(None)
+        ).update({'room_number': room_number}, synchronize_session=False)
+    return len(students)
+
+
+def rebuild_stats(batch_size=1000):
+    """Replace every stats row in one transaction; returns (complaints read, rows written)"""
+    backfill_room_numbers()
+
+    totals = {}
+    complaints = 0
+    query = db.session.query(
+        Complaint.student_id, Complaint.room_number, Complaint.department_id,
+        Complaint.status, Complaint.created_at, Complaint.resolved_at
+    )
+
+    for row in query.yield_per(batch_size):
+        counters = contribution(row.status, row.created_at, row.resolved_at)
+        for scope, scope_key in stats_keys(row):
+            totals.setdefault((scope, scope_key, row.department_id), Counter()).update(counters)
+        complaints += 1
+
+    now = datetime.utcnow()
+    ComplaintStats.query.delete(synchronize_session=False)
+    if totals:
+        db.session.execute(db.insert(ComplaintStats), [
+            dict({column: counters[column] for column in COUNTER_COLUMNS},
+                 scope=scope, scope_key=scope_key, department_id=department_id, updated_at=now)
+            for (scope, scope_key, department_id), counters in totals.items()
+        ])
+    db.session.commit()
+    return complaints, len(totals)
@@ -0,0 +1,29 @@
+"""Attachment file naming shared by the complaint form, the raw upload API and asgi.py"""
+import os
+from datetime import datetime
+from models.complaint import Attachment
+
+
+def allowed_file(filename, allowed_extensions):
+    """Check if file extension is allowed"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
+
+
+def upload_destination(upload_folder, campus, ticket_id, filename):
+    """(absolute path, path stored on the Attachment) for a new upload; each campus has its own directory"""
+    upload_dir = os.path.join(upload_folder, campus)
+    os.makedirs(upload_dir, exist_ok=True)
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    unique_filename = f"{ticket_id}_{timestamp}_{filename}"
+    return os.path.join(upload_dir, unique_filename), f'{campus}/{unique_filename}'
+
+
+def build_attachment(complaint_id, filename, file_path, file_size):
+    return Attachment(
+        complaint_id=complaint_id,
+        file_name=filename,
+        file_path=file_path,
+        file_type=filename.rsplit('.', 1)[1].lower(),
+        file_size=file_size
+    )
@@ -0,0 +1,73 @@
+"""Pre-fork warm-up for production workers.
+
+``wsgi.py`` builds the app once in the server's master process and calls
+``warm_app`` before the workers fork, so this per-process first-use work
+is done once and shared copy-on-write instead of being repeated by every
+worker on its first requests:
+
+- every Jinja template is compiled into the environment's cache
+- SQLAlchemy mappers are configured
+- the URL map and the mimetypes table are built
+- the optional subsystems listed in WARM_SUBSYSTEMS are imported; the
+  others stay lazy, so a worker that never generates a thumbnail or
+  opens analytics doesn't load Pillow or numpy
+
+The objects created so far are then frozen out of the cyclic garbage
+collector, whose bookkeeping writes would otherwise unshare their pages.
+Database engines are reset in each child after the fork, so no
+connection is ever shared between processes.
+"""
+import gc
+import importlib
+import mimetypes
+import os
+from sqlalchemy.orm import configure_mappers
+from models import db
+
+# Optional subsystems and the modules that load them
+SUBSYSTEMS = {
+    'media': ['services.media', 'PIL.Image', 'PIL.ImageOps'],
+    'analytics': ['services.analytics'],
+}
+
+
+def precompile_templates(app):
+    """Compile every HTML template into the Jinja cache; returns the number compiled"""
+    names = [name for name in app.jinja_env.list_templates() if name.endswith('.html')]
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def load_subsystems(names):
+    for name in names:
+        for module in SUBSYSTEMS[name]:
+            importlib.import_module(module)
+
+
+def reset_engines_after_fork(app):
+    """Drop pooled connections inherited from the parent (without closing the parent's sockets)"""
+    def reset():
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+    os.register_at_fork(after_in_child=reset)
+
+
+def warm_app(app):
+    """Do the per-process first-use initialization now; returns a summary for logging"""
+    with app.app_context():
+        templates = precompile_templates(app)
+        configure_mappers()
+        app.url_map.update()
+        mimetypes.init()
+        load_subsystems(app.config['WARM_SUBSYSTEMS'])
+    
+    reset_engines_after_fork(app)
+    gc.collect()
+    gc.freeze()
+    return {
+        'templates': templates,
+        'mappers': len(db.Model.registry.mappers),
+        'subsystems': list(app.config['WARM_SUBSYSTEMS'])
+    }
@@ -130,6 +130,105 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // Complaint timeline: load older pages and post replies without a full reload
+    function appendTimelineEntries(timeline, entries, position) {
+        const empty = timeline.parentNode.querySelector('[data-timeline-empty]');
+        if (empty && entries.length > 0) {
+            empty.remove();
+        }
+
+        const html = entries
+            .filter(entry => !timeline.querySelector(`[data-update-id="${entry.id}"]`))
+            .map(entry => entry.html)
+            .join('');
+        timeline.insertAdjacentHTML(position, html);
+    }
+
+    // Newer entries come oldest page first; keep following the cursor until caught up
+    function prependNewerEntries(timeline, data) {
+        appendTimelineEntries(timeline, data.entries, 'afterbegin');
+        if (!data.has_more || data.entries.length === 0) {
+            return Promise.resolve();
+        }
+
+        const url = new URL(timeline.getAttribute('data-timeline'), window.location.origin);
+        url.searchParams.set('after', data.entries[0].id);
+        return fetch(url, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(next => prependNewerEntries(timeline, next))
+            .catch(() => showNotification('Could not load new updates.', 'danger'));
+    }
+
+    const moreButtons = document.querySelectorAll('[data-timeline-more]');
+    moreButtons.forEach(button => {
+        const timeline = document.getElementById(button.getAttribute('data-timeline-more'));
+
+        button.addEventListener('click', function() {
+            const oldest = timeline.querySelector('[data-update-id]:last-child');
+            const url = new URL(timeline.getAttribute('data-timeline'), window.location.origin);
+            if (oldest) {
+                url.searchParams.set('before', oldest.getAttribute('data-update-id'));
+            }
+
+            button.disabled = true;
+            fetch(url, { headers: { 'Accept': 'application/json' } })
+                .then(response => response.json())
+                .then(data => {
+                    appendTimelineEntries(timeline, data.entries, 'beforeend');
+                    button.disabled = false;
+                    if (!data.has_more) {
+                        button.remove();
+                    }
+                })
+                .catch(() => {
+                    button.disabled = false;
+                    showNotification('Could not load older updates.', 'danger');
+                });
+        });
+    });
+
+    const timelineForms = document.querySelectorAll('form[data-timeline-form]');
+    timelineForms.forEach(form => {
+        const timeline = document.getElementById(form.getAttribute('data-timeline-form'));
+
+        form.addEventListener('submit', function(e) {
+            e.preventDefault();
+
+            const submitButton = form.querySelector('button[type="submit"]');
+            const buttonHtml = submitButton ? submitButton.innerHTML : '';
+            const newest = timeline.querySelector('[data-update-id]');
+            const formData = new FormData(form);
+            if (newest) {
+                formData.set('after', newest.getAttribute('data-update-id'));
+            }
+
+            fetch(form.action, {
+                method: 'POST',
+                body: formData,
+                headers: { 'Accept': 'application/json' }
+            })
+                .then(response => response.json().then(data => ({ ok: response.ok, data: data })))
+                .then(({ ok, data }) => {
+                    if (!ok) {
+                        showNotification(data.error || 'Could not send reply.', 'danger');
+                        return;
+                    }
+                    form.reset();
+                    return prependNewerEntries(timeline, data);
+                })
+                .catch(() => showNotification('Could not send reply.', 'danger'))
+                .finally(() => {
+                    // Undo the generic "Processing..." spinner applied on submit
+                    setTimeout(() => {
+                        if (submitButton) {
+                            submitButton.disabled = false;
+                            submitButton.innerHTML = buttonHtml;
+                        }
+                    }, 20);
+                });
+        });
+    });
+
     // Status color coding
     function updateStatusColors() {
         const statusBadges = document.querySelectorAll('.status-badge');
@@ -0,0 +1,126 @@
+"""Status changes racing another writer keep optimistic locking and the stats counters intact.
+
+Run with ``python -m pytest tests``.
+"""
+import os
+import sys
+import tempfile
+import pytest
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from models import db
+from models.cluster import ComplaintCluster
+from models.complaint import Complaint
+from models.department import Department
+from models.stats import ComplaintStats
+from models.user import User
+
+
+@pytest.fixture
+def app():
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+        SESSION_COOKIE_SECURE = False
+        TESTING = True
+        ADMISSION_LIMITS = {}
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        department = Department(name='Plumbing', email='plumbing@klu.ac.in')
+        db.session.add(department)
+        db.session.flush()
+        student = User(name='Student', email='s@klu.ac.in', role='student', registration_number='R1', room_number='A-101')
+        staff = User(name='Staff', email='st@klu.ac.in', role='department', department_id=department.id)
+        for user in (student, staff):
+            user.set_password('pw')
+        db.session.add_all([student, staff])
+        db.session.commit()
+    return app
+
+
+def file_complaints(app, count, cluster=False):
+    """File ``count`` pending complaints (in one cluster if asked); returns their ticket IDs"""
+    with app.app_context():
+        cluster_id = None
+        if cluster:
+            group = ComplaintCluster(department_id=1, size=count)
+            db.session.add(group)
+            db.session.flush()
+            cluster_id = group.id
+        complaints = []
+        for i in range(count):
+            complaint = Complaint(ticket_id=f'TCK-{i}', student_id=1, department_id=1, subject='Leak',
+                                  description='Leaking tap', status='Pending', cluster_id=cluster_id)
+            complaint.refresh_due_at()
+            db.session.add(complaint)
+            complaints.append(complaint)
+        db.session.flush()
+        ComplaintStats.complaints_filed(complaints)
+        db.session.commit()
+        return [complaint.ticket_id for complaint in complaints]
+
+
+def bump_version_once(monkeypatch, owner, name, ticket_id):
+    """After the first call to ``owner.name``, commit a version bump on the ticket from another connection"""
+    original = getattr(owner, name)
+    calls = []
+
+    def racing(*args, **kwargs):
+        result = original(*args, **kwargs)
+        if not calls:
+            calls.append(ticket_id)
+            with db.engine.begin() as connection:
+                connection.execute(text('UPDATE complaints SET version = version + 1 WHERE ticket_id = :ticket'),
+                                   {'ticket': ticket_id})
+        return result
+
+    monkeypatch.setattr(owner, name, racing)
+    return calls
+
+
+def student_counters(app):
+    with app.app_context():
+        stats = db.session.get(ComplaintStats, ('student', '1', 1))
+        return stats.open_count, stats.resolved_count
+
+
+def login(client):
+    response = client.post('/login', data={'email': 'st@klu.ac.in', 'password': 'pw'})
+    assert response.status_code == 302
+
+
+def test_status_change_retries_after_concurrent_commit(app, monkeypatch):
+    [ticket_id] = file_complaints(app, 1)
+    client = app.test_client()
+    login(client)
+    raced = bump_version_once(monkeypatch, Complaint, 'find_conflicts', ticket_id)
+
+    response = client.post(f'/department/complaint/{ticket_id}/update-status', data={
+        'status': 'Completed', 'version': '1', 'seen_status': 'Pending'
+    })
+
+    assert raced and response.status_code == 302
+    with app.app_context():
+        complaint = Complaint.query.filter_by(ticket_id=ticket_id).one()
+        assert complaint.status == 'Completed' and complaint.version == 3
+    # The upsert from the failed attempt was rolled back with it
+    assert student_counters(app) == (0, 1)
+
+
+def test_cluster_status_change_reports_concurrent_commit(app, monkeypatch):
+    ticket_ids = file_complaints(app, 2, cluster=True)
+    client = app.test_client()
+    login(client)
+    raced = bump_version_once(monkeypatch, ComplaintCluster, 'get_open_complaints', ticket_ids[0])
+
+    response = client.post('/department/cluster/1/update-status', data={'status': 'Completed'})
+
+    assert raced and response.status_code == 302
+    with app.app_context():
+        assert {c.status for c in Complaint.query} == {'Pending'}
+    assert student_counters(app) == (2, 0)
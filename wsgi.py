@@ -0,0 +1,21 @@
+"""Production WSGI entry point for pre-fork servers
+
+    gunicorn --preload --workers 4 --bind 0.0.0.0:5000 wsgi:app
+
+With --preload the app is built and warmed once in the master process
+(templates compiled, mappers configured; see services/warmup.py) and every
+worker forks from it ready to serve. Without --preload each worker warms
+itself before its first request instead of during it.
+"""
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from services.warmup import warm_app
+
+app = create_app()
+summary = warm_app(app)
+app.logger.info('Warmed %(templates)d templates, %(mappers)d mappers, subsystems %(subsystems)s', summary)